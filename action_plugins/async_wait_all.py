@@ -0,0 +1,47 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.six import string_types
+from ansible.plugins.action import ActionBase
+from ansible.utils.vars import merge_hash
+
+
+class ActionModule(ActionBase):
+    ''' Resolve the async directory and job ids, then run the async_wait_all module once '''
+
+    _VALID_ARGS = frozenset(('jids', 'timeout', 'poll', 'cleanup', 'fail_on_job_failure'))
+
+    def _job_ids(self, jids):
+        if isinstance(jids, (string_types, dict)):
+            jids = [jids]
+        job_ids = []
+        for job in jids:
+            if isinstance(job, dict):
+                if job.get('skipped'):
+                    continue
+                if 'ansible_job_id' not in job:
+                    raise AnsibleActionFail('async_wait_all: registered result has no ansible_job_id; '
+                                            'was the task run with poll: 0?')
+                job = job['ansible_job_id']
+            job_ids.append(str(job))
+        return job_ids
+
+    def run(self, tmp=None, task_vars=None):
+        results = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        module_args = dict(self._task.args)
+        module_args['jids'] = self._job_ids(module_args.get('jids') or [])
+        if not module_args['jids']:
+            results['jobs'] = {}
+            results['finished'] = 0
+            return results
+        try:
+            module_args['_async_dir'] = self.get_shell_option('async_dir', default='~/.ansible_async')
+        except AttributeError:
+            module_args['_async_dir'] = '~/.ansible_async'
+
+        results = merge_hash(results, self._execute_module(module_name='async_wait_all', module_args=module_args,
+                                                           task_vars=task_vars))
+        return results
@@ -0,0 +1,242 @@
+"""Small helpers shared by the benchmark harnesses in this directory.
+
+Everything here is standard library only so the harnesses run anywhere the
+playbooks do. Per-process CPU time and peak RSS come from ``os.wait4`` so
+that each measured command is accounted for separately.
+"""
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PAGE_KB = os.sysconf('SC_PAGE_SIZE') // 1024 if hasattr(os, 'sysconf') else 4
+
+
+class RunResult(object):
+
+    def __init__(self, cmd, returncode, wall, user, sys_time, maxrss_kb, stdout=None, stderr=None):
+        self.cmd = cmd
+        self.returncode = returncode
+        self.wall = wall
+        self.user = user
+        self.sys = sys_time
+        self.maxrss_kb = maxrss_kb
+        self.stdout = stdout
+        self.stderr = stderr
+
+    @property
+    def cpu(self):
+        return self.user + self.sys
+
+    def as_dict(self):
+        return {'returncode': self.returncode, 'wall': self.wall, 'user': self.user, 'sys': self.sys,
+                'cpu': self.cpu, 'maxrss_kb': self.maxrss_kb}
+
+
+def run(cmd, env=None, cwd=None, capture=False, stdin=None):
+    """Run a command to completion and return its wall time, CPU time and peak RSS.
+
+    ``env`` is merged over the current environment. Output is discarded unless
+    ``capture`` is true, in which case it is returned decoded on the result.
+    """
+    full_env = os.environ.copy()
+    if env:
+        full_env.update(dict((k, str(v)) for k, v in env.items()))
+    out = tempfile.TemporaryFile() if capture else subprocess.DEVNULL
+    err = tempfile.TemporaryFile() if capture else subprocess.DEVNULL
+    start = time.time()
+    proc = subprocess.Popen(cmd, env=full_env, cwd=cwd or REPO_ROOT, stdout=out, stderr=err,
+                            stdin=stdin if stdin is not None else subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.time() - start
+    proc.returncode = _exit_code(status)
+    stdout = stderr = None
+    if capture:
+        # Output goes to temporary files rather than pipes so wait4 can reap
+        # the child directly without risking a full-pipe deadlock.
+        stdout, stderr = _drain(out), _drain(err)
+    return RunResult(cmd, proc.returncode, wall, usage.ru_utime, usage.ru_stime, _rss_kb(usage.ru_maxrss),
+                     stdout, stderr)
+
+
+def run_monitored(cmd, env=None, cwd=None, on_line=None, sample_interval=0.5):
+    """Run a command while streaming its stdout and sampling its memory.
+
+    Every stdout line (as bytes) is passed to ``on_line``, stderr is merged
+    into stdout, and the RSS of the whole process tree is sampled every
+    ``sample_interval`` seconds. Returns the RunResult (with ``stdout_bytes``,
+    ``rss_samples`` as ``(seconds, kB)`` pairs and ``peak_tree_rss_kb`` set
+    on it).
+    """
+    import threading
+
+    full_env = os.environ.copy()
+    if env:
+        full_env.update(dict((k, str(v)) for k, v in env.items()))
+    counters = {'bytes': 0}
+    start = time.time()
+    proc = subprocess.Popen(cmd, env=full_env, cwd=cwd or REPO_ROOT, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+
+    def reader():
+        for line in iter(proc.stdout.readline, b''):
+            counters['bytes'] += len(line)
+            if on_line is not None:
+                on_line(line)
+        proc.stdout.close()
+
+    thread = threading.Thread(target=reader)
+    thread.daemon = True
+    thread.start()
+    samples = []
+    while thread.is_alive():
+        rss = process_tree_rss_kb(proc.pid)
+        if rss is not None:
+            samples.append((time.time() - start, rss))
+        thread.join(sample_interval)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.time() - start
+    proc.returncode = _exit_code(status)
+    result = RunResult(cmd, proc.returncode, wall, usage.ru_utime, usage.ru_stime, _rss_kb(usage.ru_maxrss))
+    result.stdout_bytes = counters['bytes']
+    result.rss_samples = samples
+    result.peak_tree_rss_kb = max([kb for _, kb in samples] or [0])
+    return result
+
+
+def _drain(f):
+    with f:
+        f.seek(0)
+        return f.read().decode('utf-8', 'replace')
+
+
+def _rss_kb(maxrss):
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    if sys.platform == 'darwin':
+        return maxrss // 1024
+    return maxrss
+
+
+def _exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of ``values`` (``pct`` in 0-100)."""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(math.floor(rank))
+    high = int(math.ceil(rank))
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def mean(values):
+    return sum(values) / len(values) if values else float('nan')
+
+
+def stdev(values):
+    if len(values) < 2:
+        return 0.0
+    avg = mean(values)
+    return math.sqrt(sum((v - avg) ** 2 for v in values) / (len(values) - 1))
+
+
+def parse_int_list(value):
+    """Parse a comma separated argparse value such as ``100,1000,10000``."""
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def which(name):
+    return shutil.which(name)
+
+
+def require_executable(name):
+    path = which(name)
+    if path is None:
+        sys.exit('{0} was not found on PATH; install Ansible to run this benchmark'.format(name))
+    return path
+
+
+@contextmanager
+def scratch_dir(prefix='bench-', keep=False):
+    path = tempfile.mkdtemp(prefix=prefix)
+    try:
+        yield path
+    finally:
+        if not keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def write_jsonl(path, records):
+    """Append records to a JSONL file, or to stdout when ``path`` is ``-``."""
+    if path == '-':
+        for record in records:
+            sys.stdout.write(json.dumps(record, sort_keys=True) + '\n')
+        return
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True) + '\n')
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def print_table(rows, columns, out=None):
+    """Print dicts as a fixed-width table; floats are shown with 4 decimals."""
+    out = out or sys.stdout
+
+    def fmt(value):
+        if isinstance(value, float):
+            return '{0:.4f}'.format(value)
+        return str(value)
+
+    cells = [[fmt(row.get(c, '')) for c in columns] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    out.write('  '.join(c.ljust(w) for c, w in zip(columns, widths)) + '\n')
+    out.write('  '.join('-' * w for w in widths) + '\n')
+    for r in cells:
+        out.write('  '.join(v.rjust(w) for v, w in zip(r, widths)) + '\n')
+
+
+def process_tree_rss_kb(pid):
+    """Current resident set size of ``pid`` and all of its descendants, in kB.
+
+    Reads /proc, so it returns None on platforms without it.
+    """
+    if not os.path.isdir('/proc'):
+        return None
+    children = {}
+    rss = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/{0}/stat'.format(entry)) as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except (IOError, OSError, IndexError):
+            continue
+        # after the command name: state, ppid, ..., rss (in pages) is field 24 overall
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss[int(entry)] = int(fields[21]) * _PAGE_KB
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += rss.get(current, 0)
+        pending.extend(children.get(current, []))
+    return total
+
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Controller memory and result handling time of ``cat`` vs. ``safe_cat`` as files grow.
+
+For every file size a text file is generated in a scratch directory and read
+against a local host by ``cat_file.yml`` (``command: cat``, registering the
+whole file) and by ``cat_file_safe.yml`` in each ``safe_cat`` mode:
+
+    cat     the whole file, as stdout and stdout_lines
+    chunk   one --chunk-size chunk and the offset of the next one
+    digest  size and sha256 only
+    window  the first and last 10 lines
+
+The ``task_profile_jsonl`` callback times the read task: ``execute`` runs
+from the worker fork to the result callback, so it includes moving the
+result back and the strategy's handling of it, and ``result_bytes`` is the
+result's JSON size (its ``result_size`` option is turned on). The run's
+wall time, CPU, the controller's peak RSS, the peak RSS of the whole
+process tree (including the workers) and the bytes printed are reported too.
+
+Example:
+
+    python benchmarks/cat_output.py --sizes 64K,1M,16M,128M,512M --modes cat,window,digest
+"""
+from argparse import ArgumentParser
+from collections import deque
+import os
+import sys
+
+import benchlib
+from fact_payload import parse_size, parse_sizes
+
+CALLBACK_DIR = os.path.join(benchlib.REPO_ROOT, 'callback_plugins')
+MODES = ('cat', 'chunk', 'digest', 'window')
+READ_ACTIONS = ('command', 'safe_cat')
+
+
+def write_file(path, size):
+    line = bytes(bytearray(48 + i % 75 for i in range(99))) + b'\n'
+    block = line * (65536 // len(line) + 1)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+
+
+def measure(mode, size, args, scratch):
+    path = os.path.join(scratch, 'cat-{0}.txt'.format(size))
+    if not os.path.exists(path):
+        write_file(path, size)
+    profile = os.path.join(scratch, '{0}-{1}.jsonl'.format(mode, size))
+    cmd = ['ansible-playbook', '-i', 'localhost,', '-c', 'local', '-e', 'file_to_cat={0}'.format(path)]
+    if mode == 'cat':
+        cmd.append('cat_file.yml')
+    else:
+        cmd.extend(['-e', 'safe_cat_mode={0}'.format(mode), '-e', 'safe_cat_chunk_size={0}'.format(args.chunk_size),
+                    'cat_file_safe.yml'])
+    tail = deque(maxlen=40)
+    result = benchlib.run_monitored(cmd, env={'ANSIBLE_CALLBACK_PLUGINS': CALLBACK_DIR,
+                                              'ANSIBLE_CALLBACK_WHITELIST': 'task_profile_jsonl',
+                                              'ANSIBLE_CALLBACKS_ENABLED': 'task_profile_jsonl',
+                                              'TASK_PROFILE_JSONL_PATH': profile,
+                                              'TASK_PROFILE_JSONL_RESULT_SIZE': '1'},
+                                    on_line=tail.append)
+    if result.returncode != 0:
+        sys.exit('{0} run of {1} bytes failed:\n{2}'.format(mode, size, b''.join(tail).decode('utf-8', 'replace')))
+    read = [e for e in benchlib.read_jsonl(profile) if e['action'] in READ_ACTIONS]
+    if not read:
+        sys.exit('no read task result in {0}'.format(profile))
+    return {'mode': mode, 'size': size, 'wall': result.wall, 'cpu': result.cpu, 'maxrss_kb': result.maxrss_kb,
+            'peak_tree_rss_kb': result.peak_tree_rss_kb, 'stdout_bytes': result.stdout_bytes,
+            'result_bytes': read[0]['result_bytes'], 'execute': read[0]['execute']}
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('64K,1M,16M,128M'),
+                        help='File sizes, e.g. 64K,1M,16M,128M (default)')
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--chunk-size', type=parse_size, default=parse_size('64K'))
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    with benchlib.scratch_dir(prefix='cat-output-') as scratch:
+        for size in args.sizes:
+            for mode in args.modes.split(','):
+                records.append(measure(mode, size, args, scratch))
+    benchlib.print_table(records, ['size', 'mode', 'wall', 'cpu', 'maxrss_kb', 'peak_tree_rss_kb', 'execute',
+                                   'result_bytes', 'stdout_bytes'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
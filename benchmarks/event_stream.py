@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Measure event and byte throughput of the callback/stdout pipeline.
+
+Runs ``chatty_stress.yml`` for every combination of message length, unicode
+share and attached result size, reading ansible-playbook's stdout as it is
+produced. For each run it reports events per second (host results and loop
+items seen on stdout), stdout bytes per second, and the controller's memory
+over time (RSS of ansible-playbook and its workers, sampled periodically).
+The full RSS timeline is included in the JSONL records.
+
+Example:
+
+    python benchmarks/event_stream.py --messages 5000 --msg-lengths 80,4096 \\
+        --unicode-ratios 0,0.5 --result-sizes 0,65536 --hosts 4 --forks 4
+"""
+from argparse import ArgumentParser
+import itertools
+import re
+import sys
+
+import benchlib
+
+_EVENT_RE = re.compile(br'^(ok|changed|failed|fatal|skipping): \[')
+
+
+def parse_float_list(value):
+    return [float(v) for v in value.split(',') if v.strip()]
+
+
+def measure(messages, msg_length, unicode_ratio, result_size, args):
+    inventory = ','.join('chatty_{0:03d}'.format(i) for i in range(args.hosts)) + ','
+    cmd = ['ansible-playbook', '-i', inventory, '-c', 'local', '-f', str(args.forks), 'chatty_stress.yml',
+           '-e', 'num_messages={0}'.format(messages),
+           '-e', 'msg_length={0}'.format(msg_length),
+           '-e', 'unicode_ratio={0}'.format(unicode_ratio),
+           '-e', 'result_size={0}'.format(result_size),
+           '-e', 'event_pause={0}'.format(args.event_pause)]
+    events = [0]
+
+    def on_line(line):
+        if _EVENT_RE.match(line):
+            events[0] += 1
+
+    result = benchlib.run_monitored(cmd, env={'ANSIBLE_STDOUT_CALLBACK': args.stdout_callback,
+                                              'ANSIBLE_FORCE_COLOR': '0'},
+                                    on_line=on_line, sample_interval=args.sample_interval)
+    if result.returncode != 0:
+        sys.exit('chatty_stress.yml failed with exit code {0}'.format(result.returncode))
+    samples = result.rss_samples
+    return {'messages': messages, 'msg_length': msg_length, 'unicode_ratio': unicode_ratio,
+            'result_size': result_size, 'hosts': args.hosts, 'forks': args.forks,
+            'stdout_callback': args.stdout_callback, 'wall': result.wall, 'cpu': result.cpu,
+            'events': events[0], 'events_per_sec': events[0] / result.wall,
+            'stdout_bytes': result.stdout_bytes, 'bytes_per_sec': result.stdout_bytes / result.wall,
+            'peak_rss_kb': result.peak_tree_rss_kb,
+            'rss_growth_kb': samples[-1][1] - samples[0][1] if len(samples) > 1 else 0,
+            'rss_samples': samples}
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--messages', type=int, default=1000, help='Events per host (default: 1000)')
+    parser.add_argument('--msg-lengths', type=benchlib.parse_int_list, default=[80, 1024])
+    parser.add_argument('--unicode-ratios', type=parse_float_list, default=[0.0])
+    parser.add_argument('--result-sizes', type=benchlib.parse_int_list, default=[0])
+    parser.add_argument('--hosts', type=int, default=1)
+    parser.add_argument('--forks', type=int, default=5)
+    parser.add_argument('--event-pause', type=float, default=0, help='Seconds between events per host')
+    parser.add_argument('--stdout-callback', default='default')
+    parser.add_argument('--sample-interval', type=float, default=0.25)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    for msg_length, unicode_ratio, result_size in itertools.product(args.msg_lengths, args.unicode_ratios,
+                                                                     args.result_sizes):
+        records.append(measure(args.messages, msg_length, unicode_ratio, result_size, args))
+    benchlib.print_table(records, ['msg_length', 'unicode_ratio', 'result_size', 'events', 'wall',
+                                   'events_per_sec', 'bytes_per_sec', 'peak_rss_kb', 'rss_growth_kb'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
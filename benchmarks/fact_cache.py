@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""Compare the sqlite_cache fact cache plugin with jsonfile at large host counts.
+
+Facts come from running ``library/test_scan_facts.py`` with a generated
+payload (``--distinct`` seeds, reused round robin across hosts). Both plugins
+are loaded through Ansible's cache plugin loader and driven the way the fact
+cache drives them, one ``set`` or ``contains``/``get`` per host, from fresh
+plugin instances so reads hit disk. For sqlite_cache the bulk
+``set_many``/``get_many`` calls are timed as well. Reported per plugin:
+
+    write_s / bulk_write_s    storing every host
+    hit_p50/p99_ms            reading a random sample of cached hosts
+    miss_p50/p99_ms           reading hosts that are not cached
+    bulk_read_s               get_many of every host (sqlite_cache only)
+    disk_bytes                everything under the cache path
+
+Ansible must be importable by the Python running this script.
+
+Example:
+
+    python benchmarks/fact_cache.py --hosts 10000 --payload-size 64K --compression-level 6
+"""
+from argparse import ArgumentParser
+import json
+import os
+import random
+import sys
+import time
+
+import benchlib
+from fact_payload import dir_size, parse_size
+
+CACHE_PLUGIN_DIR = os.path.join(benchlib.REPO_ROOT, 'cache_plugins')
+SCAN_MODULE = os.path.join(benchlib.REPO_ROOT, 'library', 'test_scan_facts.py')
+PLUGINS = ('jsonfile', 'sqlite_cache')
+
+
+def scan_facts(args, seed, scratch):
+    args_path = os.path.join(scratch, 'scan-args-{0}.json'.format(seed))
+    with open(args_path, 'w') as f:
+        json.dump({'ANSIBLE_MODULE_ARGS': {'payload_size': args.payload_size, 'payload_seed': seed,
+                                           'payload_unicode_ratio': args.unicode_ratio}}, f)
+    result = benchlib.run([sys.executable, SCAN_MODULE, args_path], capture=True)
+    if result.returncode != 0:
+        sys.exit('test_scan_facts failed:\n{0}'.format(result.stdout[-4000:]))
+    return json.loads(result.stdout)['ansible_facts']
+
+
+def load_plugin(name, path, args):
+    try:
+        from ansible.plugins.loader import cache_loader
+    except ImportError:
+        sys.exit('ansible must be importable to load cache plugins')
+    cache_loader.add_directory(CACHE_PLUGIN_DIR)
+    options = {'_uri': path, '_timeout': 0}
+    if name == 'sqlite_cache':
+        options['compression_level'] = args.compression_level
+    return cache_loader.get(name, **options)
+
+
+def timed_lookups(cache, keys):
+    ''' per-key latency of the fact cache's lookup: contains(), then get() on a hit '''
+    latencies = []
+    for key in keys:
+        start = time.perf_counter()
+        if cache.contains(key):
+            cache.get(key)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def measure(name, facts, args, scratch):
+    path = os.path.join(scratch, name)
+    os.makedirs(path)
+    hosts = ['fact_host_{0:06d}'.format(i) for i in range(args.hosts)]
+    rng = random.Random(args.seed)
+    sample = rng.sample(hosts, min(args.samples, len(hosts)))
+    misses = ['missing_host_{0:06d}'.format(i) for i in range(args.samples)]
+
+    cache = load_plugin(name, path, args)
+    start = time.time()
+    for i, host in enumerate(hosts):
+        cache.set(host, facts[i % len(facts)])
+    record = {'plugin': name, 'hosts': args.hosts, 'payload_size': args.payload_size,
+              'write_s': time.time() - start, 'disk_bytes': dir_size(path)}
+
+    hits = timed_lookups(load_plugin(name, path, args), sample)
+    missed = timed_lookups(load_plugin(name, path, args), misses)
+    record.update({'hit_p50_ms': benchlib.percentile(hits, 50), 'hit_p99_ms': benchlib.percentile(hits, 99),
+                   'miss_p50_ms': benchlib.percentile(missed, 50), 'miss_p99_ms': benchlib.percentile(missed, 99)})
+
+    if name == 'sqlite_cache':
+        cache.flush()
+        start = time.time()
+        cache.set_many(dict((host, facts[i % len(facts)]) for i, host in enumerate(hosts)))
+        record['bulk_write_s'] = time.time() - start
+        start = time.time()
+        found = load_plugin(name, path, args).get_many(hosts)
+        record['bulk_read_s'] = time.time() - start
+        if len(found) != len(hosts):
+            sys.exit('get_many returned {0} of {1} hosts'.format(len(found), len(hosts)))
+    return record
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--hosts', type=int, default=10000)
+    parser.add_argument('--payload-size', type=parse_size, default=parse_size('16K'),
+                        help='test_scan_facts payload per host, e.g. 16K (default)')
+    parser.add_argument('--unicode-ratio', type=float, default=0.0)
+    parser.add_argument('--distinct', type=int, default=8, help='Distinct payloads, reused across hosts (default: 8)')
+    parser.add_argument('--samples', type=int, default=1000, help='Hit and miss reads to time (default: 1000)')
+    parser.add_argument('--compression-level', type=int, default=6)
+    parser.add_argument('--plugins', default=','.join(PLUGINS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    with benchlib.scratch_dir(prefix='fact-cache-') as scratch:
+        facts = [scan_facts(args, seed, scratch) for seed in range(args.distinct)]
+        records = [measure(name, facts, args, scratch) for name in args.plugins.split(',')]
+    benchlib.print_table(records, ['plugin', 'hosts', 'payload_size', 'write_s', 'bulk_write_s', 'hit_p50_ms',
+                                   'hit_p99_ms', 'miss_p50_ms', 'miss_p99_ms', 'bulk_read_s', 'disk_bytes'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""Measure fact serialization and fact cache throughput as facts grow.
+
+For each payload size this runs ``scan_large_facts.yml`` (which calls
+``test_scan_facts`` with a generated payload) against a local host with a
+fact cache in a scratch directory, then runs the ``custom_facts`` tasks of
+``use_facts.yml`` so the facts are read back from the cache. Reported per
+size: wall time, CPU and peak RSS of both runs, the size written to the cache
+and the resulting write/read throughput.
+
+Example:
+
+    python benchmarks/fact_payload.py --sizes 64K,1M,10M,40M --unicode-ratio 0.25
+"""
+from argparse import ArgumentParser
+import os
+import sys
+
+import benchlib
+
+_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(value):
+    value = value.strip().upper().rstrip('B')
+    if value and value[-1] in _UNITS:
+        return int(float(value[:-1]) * _UNITS[value[-1]])
+    return int(value)
+
+
+def parse_sizes(value):
+    return [parse_size(v) for v in value.split(',') if v.strip()]
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def playbook(name, env, extra_vars=None, tags=None):
+    cmd = ['ansible-playbook', '-i', 'localhost,', '-c', 'local', name]
+    for key, value in (extra_vars or {}).items():
+        cmd.extend(['-e', '{0}={1}'.format(key, value)])
+    if tags:
+        cmd.extend(['--tags', tags])
+    result = benchlib.run(cmd, env=env, capture=True)
+    if result.returncode != 0:
+        sys.exit('{0} failed:\n{1}'.format(name, result.stdout[-4000:]))
+    return result
+
+
+def measure(size, args, scratch):
+    cache_dir = os.path.join(scratch, 'facts-{0}'.format(size))
+    env = {'ANSIBLE_CACHE_PLUGIN': args.cache_plugin,
+           'ANSIBLE_CACHE_PLUGIN_CONNECTION': cache_dir,
+           'ANSIBLE_GATHERING': 'explicit'}
+    write = playbook('scan_large_facts.yml', env, {'payload_size': size,
+                                                   'payload_depth': args.depth,
+                                                   'payload_width': args.width,
+                                                   'payload_unicode_ratio': args.unicode_ratio})
+    read = playbook('use_facts.yml', env, tags='custom_facts')
+    cached = dir_size(cache_dir)
+    return {'payload_size': size, 'cache_plugin': args.cache_plugin, 'cache_bytes': cached,
+            'write_wall': write.wall, 'write_cpu': write.cpu, 'write_maxrss_kb': write.maxrss_kb,
+            'read_wall': read.wall, 'read_cpu': read.cpu, 'read_maxrss_kb': read.maxrss_kb,
+            'write_mb_per_s': cached / write.wall / (1 << 20) if write.wall else 0.0,
+            'read_mb_per_s': cached / read.wall / (1 << 20) if read.wall else 0.0}
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('64K,1M,10M'),
+                        help='Comma separated payload sizes, e.g. 64K,1M,10M (default)')
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--width', type=int, default=10)
+    parser.add_argument('--unicode-ratio', type=float, default=0.0)
+    parser.add_argument('--cache-plugin', default='jsonfile')
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    with benchlib.scratch_dir(prefix='fact-payload-') as scratch:
+        records = [measure(size, args, scratch) for size in args.sizes]
+    benchlib.print_table(records, ['payload_size', 'cache_bytes', 'write_wall', 'write_maxrss_kb', 'read_wall',
+                                   'read_maxrss_kb', 'write_mb_per_s', 'read_mb_per_s'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
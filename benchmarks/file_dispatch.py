@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""Measure per-loop-item module dispatch cost with ``file_benchmark.yml``.
+
+Runs the playbook in ``looped`` mode (the ``file`` module once per path) and
+``batched`` mode (``file_batch`` once for the whole list) against N local
+hosts for every combination of path count, host count and fork count. Each
+host writes under its own scratch directory, which is removed between runs.
+
+A run of the same mode with ``file_count=0`` is timed for each host/fork
+combination and subtracted, so ``per_item_ms`` is the cost of handling one
+path on one host.
+
+Example:
+
+    python benchmarks/file_dispatch.py --counts 100,1000 --hosts 1,4 --forks 1,4,8 --depth 2
+"""
+from argparse import ArgumentParser
+import os
+import shutil
+import sys
+
+import benchlib
+
+MODES = ('looped', 'batched')
+
+
+def run_playbook(hosts, forks, count, mode, args, base_dir):
+    inventory = ','.join('file_bench_{0:03d}'.format(i) for i in range(hosts)) + ','
+    cmd = ['ansible-playbook', '-i', inventory, '-c', 'local', '-f', str(forks), 'file_benchmark.yml',
+           '-e', 'file_count={0}'.format(count),
+           '-e', 'file_depth={0}'.format(args.depth),
+           '-e', 'file_state={0}'.format(args.state),
+           '-e', 'file_benchmark_mode={0}'.format(mode),
+           '-e', 'file_base_dir={0}/{{{{ inventory_hostname }}}}'.format(base_dir)]
+    result = benchlib.run(cmd, capture=True)
+    shutil.rmtree(base_dir, ignore_errors=True)
+    if result.returncode != 0:
+        sys.exit('file_benchmark.yml failed:\n{0}'.format(result.stdout[-4000:]))
+    return result
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--counts', type=benchlib.parse_int_list, default=[100, 1000])
+    parser.add_argument('--hosts', type=benchlib.parse_int_list, default=[1])
+    parser.add_argument('--forks', type=benchlib.parse_int_list, default=[1, 5])
+    parser.add_argument('--depth', type=int, default=1)
+    parser.add_argument('--state', default='directory', choices=['directory', 'touch'])
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    with benchlib.scratch_dir(prefix='file-dispatch-') as scratch:
+        base_dir = os.path.join(scratch, 'files')
+        for hosts in args.hosts:
+            for forks in args.forks:
+                modes = args.modes.split(',')
+                baseline = dict((mode, run_playbook(hosts, forks, 0, mode, args, base_dir).wall) for mode in modes)
+                for count in args.counts:
+                    for mode in modes:
+                        result = run_playbook(hosts, forks, count, mode, args, base_dir)
+                        items = count * hosts
+                        records.append({'mode': mode, 'count': count, 'hosts': hosts, 'forks': forks,
+                                        'depth': args.depth, 'wall': result.wall, 'cpu': result.cpu,
+                                        'maxrss_kb': result.maxrss_kb, 'baseline_wall': baseline[mode],
+                                        'per_item_ms': max(result.wall - baseline[mode], 0.0) * 1000 / items})
+    benchlib.print_table(records, ['mode', 'count', 'hosts', 'forks', 'wall', 'cpu', 'per_item_ms'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Profile end-of-play stats handling as the host count grows.
+
+For every host count this runs ``gen_host_status.yml`` against
+``inventories/gen_host_status_inventory.py`` with the requested outcome mix,
+and then ``set_stats_scale.yml`` (the ``test_set_stats.yml`` data set from
+every host) against the same hosts. The ``task_profile_jsonl`` callback marks
+when the last host result arrived. Everything after that point, up to the
+process exiting, is the tail: the play recap, stats aggregation and custom
+stats output. The tail is reported with the total wall time and the
+controller's peak RSS.
+
+Example:
+
+    python benchmarks/host_status_stats.py --hosts 1000,5000,20000 \\
+        --mix ok=70,changed=15,failed=5,ignored=4,rescued=3,skipped=3 --forks 50
+"""
+from argparse import ArgumentParser
+import os
+import time
+
+import benchlib
+
+INVENTORY = os.path.join(benchlib.REPO_ROOT, 'inventories', 'gen_host_status_inventory.py')
+CALLBACK_DIR = os.path.join(benchlib.REPO_ROOT, 'callback_plugins')
+PLAYBOOKS = ('gen_host_status.yml', 'set_stats_scale.yml')
+
+
+def measure(playbook, hosts, args, scratch):
+    profile = os.path.join(scratch, '{0}-{1}.jsonl'.format(playbook, hosts))
+    cmd = ['ansible-playbook', '-i', INVENTORY, '-f', str(args.forks), playbook]
+    if playbook == 'set_stats_scale.yml':
+        cmd.extend(['-e', 'set_stats_per_host={0}'.format(args.per_host)])
+    start = time.time()
+    # failed hosts make gen_host_status.yml exit non-zero, which is expected here
+    result = benchlib.run(cmd, env={'GEN_HOST_STATUS_HOSTS': hosts,
+                                    'GEN_HOST_STATUS_MIX': args.mix,
+                                    'ANSIBLE_SHOW_CUSTOM_STATS': '1',
+                                    'ANSIBLE_HOST_KEY_CHECKING': '0',
+                                    'ANSIBLE_CALLBACK_PLUGINS': CALLBACK_DIR,
+                                    'ANSIBLE_CALLBACK_WHITELIST': 'task_profile_jsonl',
+                                    'ANSIBLE_CALLBACKS_ENABLED': 'task_profile_jsonl',
+                                    'TASK_PROFILE_JSONL_PATH': profile})
+    events = benchlib.read_jsonl(profile) if os.path.exists(profile) else []
+    last_result = max(e['ts'] for e in events) if events else start
+    return {'playbook': playbook, 'hosts': hosts, 'forks': args.forks, 'mix': args.mix,
+            'returncode': result.returncode, 'wall': result.wall, 'cpu': result.cpu,
+            'maxrss_kb': result.maxrss_kb, 'results': len(events),
+            'tail': start + result.wall - last_result}
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--hosts', type=benchlib.parse_int_list, default=[100, 1000, 5000])
+    parser.add_argument('--mix', default='ok=1,skipped=1,changed=1,failed=1,ignored=1,rescued=1')
+    parser.add_argument('--forks', type=int, default=50)
+    parser.add_argument('--per-host', action='store_true', help='Use per_host set_stats')
+    parser.add_argument('--playbooks', default=','.join(PLAYBOOKS))
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    with benchlib.scratch_dir(prefix='host-status-stats-') as scratch:
+        for hosts in args.hosts:
+            for playbook in args.playbooks.split(','):
+                records.append(measure(playbook, hosts, args, scratch))
+    benchlib.print_table(records, ['playbook', 'hosts', 'returncode', 'wall', 'tail', 'cpu', 'maxrss_kb'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""Controller time and memory of full hostvars dumps vs. selective access.
+
+Generates an inventory of N local hosts with V vars each (one of them a
+template referencing another) and, optionally, ``setfact_50.yml``-style
+accumulation: S unrolled ``set_fact`` tasks per host, each appending to a
+list fact. A final ``run_once`` task then reads the hosts' vars one of four
+ways:
+
+    full              debug var=hostvars, as in debug_hostvars.yml
+    extract           groups['all'] | map('extract', hostvars, key) per key
+    lookup            the hostvars_select lookup (source=inventory, the default)
+    lookup_vars       the hostvars_select lookup with source=vars
+
+Every mode but ``full`` reads the same keys: two inventory vars, plus the
+accumulated fact when S > 0. The whole run's wall time, CPU, peak controller
+RSS and peak process tree RSS are reported, along with the time and RSS of a
+baseline run that skips the read, so the access cost is the difference.
+
+Example:
+
+    python benchmarks/hostvars_access.py --hosts 100,1000 --vars 10,100 --setfact-steps 0,50
+"""
+from argparse import ArgumentParser
+from collections import deque
+import json
+import os
+import sys
+
+import benchlib
+
+LOOKUP_PLUGIN_DIR = os.path.join(benchlib.REPO_ROOT, 'lookup_plugins')
+MODES = ('baseline', 'full', 'extract', 'lookup', 'lookup_vars')
+
+
+def write_inventory(path, hosts, nvars, value_length):
+    filler = 'v' * value_length
+    inventory = {'all': {'vars': {'ansible_connection': 'local', 'bench_group_var': filler}, 'hosts': {}}}
+    for h in range(hosts):
+        host_vars = dict(('var_{0}'.format(i), '{0}-{1}'.format(filler, i)) for i in range(2, nvars))
+        host_vars['var_0'] = '{{ inventory_hostname }}-{{ var_1 }}'
+        host_vars['var_1'] = h
+        inventory['all']['hosts']['hv_host_{0:05d}'.format(h)] = host_vars
+    with open(path, 'w') as f:
+        json.dump(inventory, f)
+
+
+def read_task(mode, keys):
+    if mode == 'full':
+        return ['    - debug:', '        var: hostvars']
+    if mode == 'extract':
+        body = ', '.join("'{0}': groups['all'] | map('extract', hostvars, '{0}') | list".format(k) for k in keys)
+        return ['    - debug:', '        msg: "{{{{ {{{0}}} }}}}"'.format(body)]
+    source = 'vars' if mode == 'lookup_vars' else 'inventory'
+    return ['    - debug:',
+            '        msg: "{{{{ lookup(\'hostvars_select\', \'all\', keys={0}, source=\'{1}\') }}}}"'.format(
+                json.dumps(keys).replace('"', "'"), source)]
+
+
+def write_playbook(path, mode, steps, keys):
+    lines = ['- hosts: all', '  gather_facts: false', '  tasks:']
+    lines.append('    - set_fact:')
+    lines.append('        accumulated: []')
+    for i in range(steps):
+        lines.append('    - set_fact:')
+        lines.append('        accumulated: "{{{{ accumulated + [{{\'step\': {0}, \'host\': inventory_hostname}}] }}}}"'.format(i))
+    if mode != 'baseline':
+        lines.extend(['', '- hosts: all', '  gather_facts: false', '  tasks:'])
+        lines.extend(read_task(mode, keys))
+        lines.append('      run_once: true')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def measure(mode, hosts, nvars, steps, args, scratch):
+    inventory = os.path.join(scratch, 'inventory-{0}-{1}.json'.format(hosts, nvars))
+    if not os.path.exists(inventory):
+        write_inventory(inventory, hosts, nvars, args.value_length)
+    keys = ['var_0', 'var_1'] + (['accumulated'] if steps else [])
+    playbook = os.path.join(scratch, '{0}-{1}.yml'.format(mode, steps))
+    write_playbook(playbook, mode, steps, keys)
+    tail = deque(maxlen=40)
+    result = benchlib.run_monitored(['ansible-playbook', '-i', inventory, '-f', str(args.forks), playbook],
+                                    env={'ANSIBLE_LOOKUP_PLUGINS': LOOKUP_PLUGIN_DIR}, on_line=tail.append)
+    if result.returncode != 0:
+        sys.exit('{0} run failed:\n{1}'.format(mode, b''.join(tail).decode('utf-8', 'replace')))
+    return {'mode': mode, 'hosts': hosts, 'vars': nvars, 'setfact_steps': steps, 'forks': args.forks,
+            'wall': result.wall, 'cpu': result.cpu, 'maxrss_kb': result.maxrss_kb,
+            'peak_tree_rss_kb': result.peak_tree_rss_kb, 'stdout_bytes': result.stdout_bytes}
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--hosts', type=benchlib.parse_int_list, default=[50, 200])
+    parser.add_argument('--vars', type=benchlib.parse_int_list, default=[10, 100], help='Vars per host')
+    parser.add_argument('--setfact-steps', type=benchlib.parse_int_list, default=[0, 50],
+                        help='set_fact accumulation tasks per host before the read (default: 0,50)')
+    parser.add_argument('--value-length', type=int, default=32)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--forks', type=int, default=5)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    with benchlib.scratch_dir(prefix='hostvars-access-') as scratch:
+        for hosts in args.hosts:
+            for nvars in args.vars:
+                for steps in args.setfact_steps:
+                    for mode in args.modes.split(','):
+                        records.append(measure(mode, hosts, nvars, steps, args, scratch))
+    benchlib.print_table(records, ['hosts', 'vars', 'setfact_steps', 'mode', 'wall', 'cpu', 'maxrss_kb',
+                                   'peak_tree_rss_kb', 'stdout_bytes'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""Time the metaless ``--host`` inventory path against the ``_meta`` path.
+
+When an inventory script omits ``_meta``, Ansible runs it once with ``--list``
+and then once more per host with ``--host``. This harness drives
+``inventories/synthetic_dyn_inventory.py`` the same way the script inventory
+plugin does and compares three modes as host count grows:
+
+    meta      one --list call that includes _meta.hostvars
+    metaless  --list, then a separate --host process per host
+    indexed   as metaless, but --list also writes an mmap-able hostvars
+              index and every --host call answers from it
+
+Per-host cost is split into interpreter/script startup and the lookup itself
+(reported by the script on stderr). Pass ``--ansible`` to additionally time
+``ansible-inventory --list`` end to end for each mode.
+
+Example:
+
+    python benchmarks/inventory_host_lookup.py --hosts 100,1000,5000 --host-sample 500
+"""
+from argparse import ArgumentParser
+import os
+import random
+import re
+import sys
+
+import benchlib
+
+SCRIPT = os.path.join(benchlib.REPO_ROOT, 'inventories', 'synthetic_dyn_inventory.py')
+MODES = ('meta', 'metaless', 'indexed')
+_LOOKUP_RE = re.compile(r'synthetic_inventory_lookup_seconds=([0-9.]+)')
+
+
+def mode_env(mode, hosts, args, index_path):
+    env = {'SYNTH_INV_HOSTS': hosts,
+           'SYNTH_INV_GROUPS': args.groups,
+           'SYNTH_INV_OVERLAP': args.overlap,
+           'SYNTH_INV_VARS_PER_HOST': args.vars_per_host,
+           'SYNTH_INV_META': '1' if mode == 'meta' else '0',
+           'SYNTH_INV_TIMING': '1'}
+    if mode == 'indexed':
+        env['SYNTH_INV_INDEX'] = index_path
+    return env
+
+
+def lookup_seconds(result):
+    match = _LOOKUP_RE.search(result.stderr or '')
+    return float(match.group(1)) if match else 0.0
+
+
+def host_names(hosts):
+    width = len(str(max(hosts - 1, 0)))
+    return ['synthetic_host_{0:0{1}d}'.format(i, width) for i in range(hosts)]
+
+
+def measure(mode, hosts, args, scratch):
+    index_path = os.path.join(scratch, 'hostvars-{0}.idx'.format(hosts))
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    env = mode_env(mode, hosts, args, index_path)
+    listed = benchlib.run([sys.executable, SCRIPT, '--list'], env=env, capture=True)
+    if listed.returncode != 0:
+        sys.exit('--list failed for {0} hosts in {1} mode:\n{2}'.format(hosts, mode, listed.stderr))
+    record = {'mode': mode, 'hosts': hosts, 'list_wall': listed.wall, 'list_maxrss_kb': listed.maxrss_kb,
+              'list_lookup': lookup_seconds(listed), 'host_calls': 0}
+    if mode != 'meta':
+        names = host_names(hosts)
+        if args.host_sample and args.host_sample < hosts:
+            names = random.Random(args.seed).sample(names, args.host_sample)
+        walls = []
+        lookups = []
+        for name in names:
+            result = benchlib.run([sys.executable, SCRIPT, '--host', name], env=env, capture=True)
+            walls.append(result.wall)
+            lookups.append(lookup_seconds(result))
+        record.update({
+            'host_calls': len(names),
+            'host_wall_mean': benchlib.mean(walls),
+            'host_wall_p95': benchlib.percentile(walls, 95),
+            'host_lookup_mean': benchlib.mean(lookups),
+            'host_startup_mean': benchlib.mean(walls) - benchlib.mean(lookups),
+            # extrapolated to every host when only a sample was timed
+            'host_wall_total': benchlib.mean(walls) * hosts,
+        })
+    record['total_wall'] = record['list_wall'] + record.get('host_wall_total', 0.0)
+    if args.ansible:
+        result = benchlib.run(['ansible-inventory', '-i', SCRIPT, '--list'], env=env)
+        record['ansible_inventory_wall'] = result.wall
+        record['ansible_inventory_maxrss_kb'] = result.maxrss_kb
+    return record
+
+
+def interpreter_baseline(trials=10):
+    walls = [benchlib.run([sys.executable, '-c', 'pass']).wall for _ in range(trials)]
+    return benchlib.mean(walls)
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--hosts', type=benchlib.parse_int_list, default=[100, 1000, 5000],
+                        help='Comma separated host counts (default: 100,1000,5000)')
+    parser.add_argument('--groups', type=int, default=10)
+    parser.add_argument('--overlap', type=float, default=0.1)
+    parser.add_argument('--vars-per-host', type=int, default=5)
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help='Comma separated subset of {0}'.format(', '.join(MODES)))
+    parser.add_argument('--host-sample', type=int, default=0,
+                        help='Time only this many random --host calls and extrapolate (default: all hosts)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ansible', action='store_true', help='Also time ansible-inventory --list')
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    modes = [m for m in args.modes.split(',') if m]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        sys.exit('unknown modes: {0}'.format(', '.join(sorted(unknown))))
+    if args.ansible:
+        benchlib.require_executable('ansible-inventory')
+    baseline = interpreter_baseline()
+    print('python startup baseline: {0:.4f}s'.format(baseline))
+    records = []
+    with benchlib.scratch_dir(prefix='inventory-host-lookup-') as scratch:
+        for hosts in args.hosts:
+            for mode in modes:
+                record = measure(mode, hosts, args, scratch)
+                record['python_startup'] = baseline
+                records.append(record)
+    columns = ['mode', 'hosts', 'list_wall', 'host_calls', 'host_startup_mean', 'host_lookup_mean',
+               'host_wall_total', 'total_wall']
+    if args.ansible:
+        columns.append('ansible_inventory_wall')
+    benchlib.print_table(records, columns)
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""Parse and merge cost of N layered inventory sources vs. one compiled inventory.
+
+Generates N sources in the shape of ``inventories/more_inventories/``:
+alternating INI files and inventory scripts, each with its own groups plus
+groups shared with the other sources (like ``group_four_five_and_six_host_*``
+and the ``ungrouped`` hosts), group vars and a few host vars. The sources are
+compiled with ``utils/compile_inventory.py`` and ``ansible-inventory --list``
+is timed against all of them (``-i`` once per source) and against the
+compiled file. Both ``--list`` outputs must be identical.
+
+Example:
+
+    python benchmarks/inventory_merge.py --sources 2,8,32 --hosts 200 --shared 0.5
+"""
+from argparse import ArgumentParser
+import json
+import os
+import sys
+
+import benchlib
+
+COMPILER = os.path.join(benchlib.REPO_ROOT, 'utils', 'compile_inventory.py')
+SCRIPT = '''#!{python}
+import json
+import sys
+
+INVENTORY = {inventory}
+
+if len(sys.argv) > 1 and sys.argv[1] == '--host':
+    print(json.dumps({{}}))
+else:
+    print(json.dumps(INVENTORY))
+'''
+
+
+def source_groups(index, args):
+    ''' {group: {"hosts": {host: hostvars}, "vars": {...}}} for one source '''
+    own = args.hosts - int(args.hosts * args.shared)
+    groups = {}
+    for g in range(args.groups):
+        name = 'source_{0}_group_{1}'.format(index, g)
+        groups[name] = {'hosts': {}, 'vars': {'is_in_{0}'.format(name): True}}
+    for g in range(args.shared_groups):
+        name = 'shared_group_{0}'.format(g)
+        groups[name] = {'hosts': {}, 'vars': {'is_in_{0}'.format(name): True, 'shared_group_source': index}}
+    groups['ungrouped'] = {'hosts': {}, 'vars': {}}
+    for h in range(args.hosts):
+        if h < own:
+            host = 'source_{0}_host_{1:05d}'.format(index, h)
+        else:
+            host = 'shared_host_{0:05d}'.format(h - own)
+        if h % 10 == 0:
+            groups['ungrouped']['hosts'][host] = {}
+            continue
+        group = 'source_{0}_group_{1}'.format(index, h % args.groups)
+        groups[group]['hosts'][host] = {'{0}_has_this_var'.format(host): index} if h % 7 == 0 else {}
+        if h >= own and args.shared_groups:
+            groups['shared_group_{0}'.format(h % args.shared_groups)]['hosts'][host] = {}
+    return groups
+
+
+def write_ini(path, index, groups):
+    lines = []
+    for group, data in sorted(groups.items()):
+        lines.append('[{0}]'.format(group))
+        for host, hostvars in data['hosts'].items():
+            lines.append(' '.join([host] + ['{0}={1}'.format(k, v) for k, v in sorted(hostvars.items())]))
+        if data['vars']:
+            lines.append('[{0}:vars]'.format(group))
+            lines.extend('{0}={1}'.format(k, v) for k, v in sorted(data['vars'].items()))
+    lines.append('[all:vars]')
+    lines.append('ansible_connection=local')
+    lines.append('source_{0}_var=True'.format(index))
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def write_script(path, index, groups):
+    inventory = {'all': {'vars': {'ansible_connection': 'local', 'source_{0}_var'.format(index): True}},
+                 '_meta': {'hostvars': {}}}
+    for group, data in groups.items():
+        inventory[group] = {'hosts': list(data['hosts']), 'vars': data['vars']}
+        for host, hostvars in data['hosts'].items():
+            if hostvars:
+                inventory['_meta']['hostvars'][host] = hostvars
+    with open(path, 'w') as f:
+        f.write(SCRIPT.format(python=sys.executable, inventory=json.dumps(inventory)))
+    os.chmod(path, 0o755)
+
+
+def generate_sources(scratch, count, args):
+    base = os.path.join(scratch, 'sources-{0}'.format(count))
+    os.makedirs(base)
+    paths = []
+    for index in range(count):
+        groups = source_groups(index, args)
+        if index % 2 == 0 or args.kinds == 'ini':
+            path = os.path.join(base, 'source_{0:03d}.ini'.format(index))
+            write_ini(path, index, groups)
+        else:
+            path = os.path.join(base, 'source_{0:03d}.py'.format(index))
+            write_script(path, index, groups)
+        paths.append(path)
+    return paths
+
+
+def time_list(mode, sources, count, args):
+    cmd = ['ansible-inventory', '--list']
+    for source in sources:
+        cmd.extend(['-i', source])
+    results = []
+    for _ in range(args.trials):
+        result = benchlib.run(cmd, capture=True)
+        if result.returncode != 0:
+            sys.exit('{0} --list failed:\n{1}'.format(mode, result.stderr[-4000:]))
+        results.append(result)
+    record = {'mode': mode, 'sources': count, 'hosts_per_source': args.hosts, 'shared': args.shared,
+              'trials': args.trials,
+              'wall': benchlib.mean([r.wall for r in results]),
+              'wall_stdev': benchlib.stdev([r.wall for r in results]),
+              'cpu': benchlib.mean([r.cpu for r in results]),
+              'maxrss_kb': max(r.maxrss_kb for r in results)}
+    return record, json.loads(results[-1].stdout)
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sources', type=benchlib.parse_int_list, default=[2, 8])
+    parser.add_argument('--hosts', type=int, default=100, help='Hosts per source (default: 100)')
+    parser.add_argument('--shared', type=float, default=0.3,
+                        help='Fraction of each source\'s hosts that appear in every source (default: 0.3)')
+    parser.add_argument('--groups', type=int, default=3, help='Groups only in one source (default: 3)')
+    parser.add_argument('--shared-groups', type=int, default=3, help='Groups in every source (default: 3)')
+    parser.add_argument('--kinds', choices=('mixed', 'ini'), default='mixed',
+                        help='Alternate INI files and scripts, or INI only (default: mixed)')
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-inventory')
+    records = []
+    with benchlib.scratch_dir(prefix='inventory-merge-') as scratch:
+        for count in args.sources:
+            sources = generate_sources(scratch, count, args)
+            compiled = os.path.join(scratch, 'compiled-{0}.yml'.format(count))
+            compile_result = benchlib.run([sys.executable, COMPILER, '-o', compiled] + sources, capture=True)
+            if compile_result.returncode != 0:
+                sys.exit('compiling failed:\n{0}'.format(compile_result.stderr[-4000:]))
+            layered, layered_list = time_list('layered', sources, count, args)
+            single, single_list = time_list('compiled', [compiled], count, args)
+            for record in (layered, single):
+                record['compile_wall'] = compile_result.wall
+                record['matches'] = layered_list == single_list
+            records.extend([layered, single])
+    benchlib.print_table(records, ['sources', 'mode', 'wall', 'wall_stdev', 'cpu', 'maxrss_kb', 'compile_wall',
+                                   'matches'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""Compare cold and cached parses of the ``synthetic`` inventory plugin.
+
+For every host count this writes a ``synthetic.yaml`` source into a scratch
+directory and runs ``ansible-inventory --list`` against it three ways:
+
+    nocache   cache disabled; every parse generates the topology
+    cold      cache enabled but empty; generate, then write the cache
+    cached    cache enabled and warm; read the topology from the cache
+
+The plugin's own breakdown (generate, cache_read, cache_write, populate) is
+captured from stderr alongside wall time, CPU and peak RSS, so the cost of
+``add_host``/``add_group``/``set_variable`` shows up on its own.
+
+Example:
+
+    python benchmarks/inventory_plugin_cache.py --hosts 1000,10000,100000 --cache-plugin jsonfile
+"""
+from argparse import ArgumentParser
+import os
+import re
+import shutil
+import sys
+
+import benchlib
+
+PLUGIN_DIR = os.path.join(benchlib.REPO_ROOT, 'inventories', 'user_plugins')
+_TIMING_RE = re.compile(r'(\w+)=([0-9.]+)s')
+MODES = ('nocache', 'cold', 'cached')
+
+SOURCE_TEMPLATE = '''plugin: synthetic
+hosts: {hosts}
+group_depth: {group_depth}
+group_fanout: {group_fanout}
+vars_per_host: {vars_per_host}
+report_timing: true
+cache: {cache}
+cache_plugin: {cache_plugin}
+cache_connection: {cache_connection}
+'''
+
+
+def write_source(scratch, hosts, args, cache):
+    path = os.path.join(scratch, 'synthetic.yaml')
+    with open(path, 'w') as f:
+        f.write(SOURCE_TEMPLATE.format(hosts=hosts, group_depth=args.group_depth, group_fanout=args.group_fanout,
+                                       vars_per_host=args.vars_per_host, cache='true' if cache else 'false',
+                                       cache_plugin=args.cache_plugin,
+                                       cache_connection=os.path.join(scratch, 'cache')))
+    return path
+
+
+def plugin_timings(stderr):
+    for line in (stderr or '').splitlines():
+        if line.startswith('synthetic inventory:'):
+            return dict((k, float(v)) for k, v in _TIMING_RE.findall(line))
+    return {}
+
+
+def parse_once(source):
+    result = benchlib.run(['ansible-inventory', '-i', source, '--list', '--export',
+                           '--playbook-dir', PLUGIN_DIR], capture=True)
+    if result.returncode != 0:
+        sys.exit('ansible-inventory failed:\n{0}'.format(result.stderr))
+    record = result.as_dict()
+    record.update(plugin_timings(result.stderr))
+    return record
+
+
+def measure(hosts, args, scratch):
+    records = []
+    cache_dir = os.path.join(scratch, 'cache')
+    for trial in range(args.trials):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        source = write_source(scratch, hosts, args, cache=False)
+        records.append(dict(parse_once(source), mode='nocache', hosts=hosts, trial=trial))
+
+        source = write_source(scratch, hosts, args, cache=True)
+        records.append(dict(parse_once(source), mode='cold', hosts=hosts, trial=trial))
+        records.append(dict(parse_once(source), mode='cached', hosts=hosts, trial=trial))
+    return records
+
+
+def summarize(records):
+    rows = []
+    keys = sorted(set((r['hosts'], r['mode']) for r in records), key=lambda k: (k[0], MODES.index(k[1])))
+    for hosts, mode in keys:
+        group = [r for r in records if r['hosts'] == hosts and r['mode'] == mode]
+        row = {'hosts': hosts, 'mode': mode, 'trials': len(group)}
+        for key in ('wall', 'generate', 'cache_read', 'cache_write', 'populate'):
+            values = [r[key] for r in group if key in r]
+            if values:
+                row[key] = benchlib.mean(values)
+        row['maxrss_kb'] = max(r['maxrss_kb'] for r in group)
+        rows.append(row)
+    return rows
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--hosts', type=benchlib.parse_int_list, default=[1000, 10000, 100000],
+                        help='Comma separated host counts (default: 1000,10000,100000)')
+    parser.add_argument('--group-depth', type=int, default=2)
+    parser.add_argument('--group-fanout', type=int, default=4)
+    parser.add_argument('--vars-per-host', type=int, default=5)
+    parser.add_argument('--cache-plugin', default='jsonfile')
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-inventory')
+    records = []
+    with benchlib.scratch_dir(prefix='inventory-plugin-cache-') as scratch:
+        for hosts in args.hosts:
+            records.extend(measure(hosts, args, scratch))
+    benchlib.print_table(summarize(records), ['hosts', 'mode', 'trials', 'wall', 'generate', 'cache_read',
+                                              'cache_write', 'populate', 'maxrss_kb'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
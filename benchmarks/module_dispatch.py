@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""Split per-task module dispatch overhead into its parts, for basic-based and lean modules.
+
+For every module the payload Ansible would send is built in process with
+``module_common.modify_module`` and then run directly with the target
+Python, the way a pipelined local connection runs it (payload on stdin).
+Reported per module:
+
+    payload_bytes   size of the built payload (AnsiballZ zip + wrapper, or the
+                    plain source for a jsonargs module like lean_ping)
+    build_cold_ms   first build in a fresh process (empty AnsiballZ cache)
+    build_ms        median rebuild, as for every later task in a run
+    exec_ms         median run time of the payload, interpreter start included
+    import_ms       import time inside that run beyond a bare interpreter's,
+                    from ``python -X importtime``
+    parse_ms        median time to filter and decode the module's stdout, as
+                    ActionBase._parse_returned_data does
+
+Then a generated playbook runs ``--tasks`` tasks of the module against
+localhost over the local connection, with pipelining off and on. A run of
+the same play with no tasks is subtracted, so ``per_task_ms`` is the whole
+controller-side cost of one task. The built-in ``ping`` and
+``library/test_scan_facts.py`` use ``ansible.module_utils.basic``;
+``library/lean_ping.py`` imports only ``json`` and ``sys``.
+
+Ansible must be importable by the Python running this script.
+
+Example:
+
+    python benchmarks/module_dispatch.py --modules ping,lean_ping,test_scan_facts --tasks 50 --repeats 20
+"""
+from argparse import ArgumentParser
+import json
+import os
+import sys
+import time
+
+import benchlib
+
+LIBRARY_DIR = os.path.join(benchlib.REPO_ROOT, 'library')
+MODULES = ('ping', 'lean_ping', 'test_scan_facts')
+PIPELINING = ('false', 'true')
+
+
+def internal_args(module):
+    ''' the _ansible_* arguments the action plugin adds to every module call, with their defaults '''
+    from ansible import __version__
+    return {'_ansible_check_mode': False, '_ansible_no_log': False, '_ansible_debug': False,
+            '_ansible_diff': False, '_ansible_verbosity': 0, '_ansible_version': __version__,
+            '_ansible_module_name': module, '_ansible_syslog_facility': 'LOG_USER',
+            '_ansible_selinux_special_fs': ['fuse', 'nfs', 'vboxsf', 'ramfs', '9p', 'vfat'],
+            '_ansible_string_conversion_action': 'warn', '_ansible_socket': None,
+            '_ansible_shell_executable': '/bin/sh', '_ansible_keep_remote_files': False,
+            '_ansible_tmpdir': None, '_ansible_remote_tmp': '~/.ansible/tmp'}
+
+
+def build_payloads(module, args):
+    ''' (payload, first build ms, median rebuild ms) '''
+    try:
+        from ansible.executor.module_common import modify_module
+        from ansible.parsing.dataloader import DataLoader
+        from ansible.plugins.loader import module_loader
+        from ansible.template import Templar
+    except ImportError:
+        sys.exit('ansible must be importable to build module payloads')
+    module_loader.add_directory(LIBRARY_DIR)
+    path = module_loader.find_plugin(module)
+    if path is None:
+        sys.exit('module {0} not found'.format(module))
+    templar = Templar(loader=DataLoader())
+    task_vars = {'ansible_python_interpreter': args.python}
+    timings = []
+    payload = None
+    for _ in range(args.repeats + 1):
+        start = time.perf_counter()
+        payload, _, _ = modify_module(module, path, internal_args(module), templar, task_vars=task_vars)
+        timings.append((time.perf_counter() - start) * 1000)
+    return payload, timings[0], benchlib.percentile(timings[1:], 50)
+
+
+def run_payload(payload, python, scratch, importtime=False):
+    path = os.path.join(scratch, 'payload.py')
+    with open(path, 'wb') as f:
+        f.write(payload)
+    cmd = [python] + (['-X', 'importtime'] if importtime else []) + ['-']
+    with open(path, 'rb') as stdin:
+        return benchlib.run(cmd, capture=True, stdin=stdin)
+
+
+def sum_import_us(stderr):
+    ''' total self time in microseconds of the imports python -X importtime reported '''
+    total = 0
+    for line in stderr.splitlines():
+        if line.startswith('import time:'):
+            fields = line.split('|')
+            try:
+                total += int(fields[0].split(':')[1])
+            except (IndexError, ValueError):
+                continue
+    return total
+
+
+def measure_components(module, args, scratch):
+    from ansible.module_utils.json_utils import _filter_non_json_lines
+
+    payload, build_cold, build = build_payloads(module, args)
+    runs = [run_payload(payload, args.python, scratch) for _ in range(args.repeats)]
+    for result in runs:
+        if result.returncode != 0:
+            sys.exit('{0} payload failed:\n{1}{2}'.format(module, result.stdout[-4000:], result.stderr[-4000:]))
+    stdout = runs[-1].stdout
+
+    baseline = benchlib.run([args.python, '-X', 'importtime', '-c', 'pass'], capture=True)
+    imports = [sum_import_us(run_payload(payload, args.python, scratch, importtime=True).stderr)
+               for _ in range(args.repeats)]
+    parse = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        filtered, _ = _filter_non_json_lines(stdout, objects_only=True)
+        json.loads(filtered)
+        parse.append((time.perf_counter() - start) * 1000)
+    return {'module': module, 'payload_bytes': len(payload), 'build_cold_ms': build_cold, 'build_ms': build,
+            'exec_ms': benchlib.percentile([r.wall * 1000 for r in runs], 50),
+            'import_ms': (benchlib.percentile(imports, 50) - sum_import_us(baseline.stderr)) / 1000.0,
+            'parse_ms': benchlib.percentile(parse, 50), 'result_bytes': len(stdout)}
+
+
+def write_playbook(path, module, tasks):
+    lines = ['- hosts: all', '  gather_facts: false', '  tasks:']
+    if not tasks:
+        lines[-1] += ' []'
+    for _ in range(tasks):
+        lines.append('    - {0}:'.format(module))
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def run_playbook(path, pipelining, args):
+    walls = []
+    for _ in range(args.runs):
+        result = benchlib.run(['ansible-playbook', '-i', 'localhost,', '-c', 'local',
+                               '-e', 'ansible_python_interpreter={0}'.format(args.python), path],
+                              env={'ANSIBLE_LIBRARY': LIBRARY_DIR, 'ANSIBLE_PIPELINING': pipelining},
+                              capture=True)
+        if result.returncode != 0:
+            sys.exit('{0} failed:\n{1}'.format(path, result.stdout[-4000:]))
+        walls.append(result.wall)
+    return benchlib.percentile(walls, 50)
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--modules', default=','.join(MODULES))
+    parser.add_argument('--tasks', type=int, default=50, help='Tasks per timed playbook run (default: 50)')
+    parser.add_argument('--repeats', type=int, default=20, help='Repeats of each in-process measurement')
+    parser.add_argument('--runs', type=int, default=3, help='Playbook runs per setting, the median is kept')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter modules run with')
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    with benchlib.scratch_dir(prefix='module-dispatch-') as scratch:
+        empty = os.path.join(scratch, 'empty.yml')
+        write_playbook(empty, None, 0)
+        baseline = dict((pipelining, run_playbook(empty, pipelining, args)) for pipelining in PIPELINING)
+        for module in args.modules.split(','):
+            components = measure_components(module, args, scratch)
+            playbook = os.path.join(scratch, '{0}.yml'.format(module))
+            write_playbook(playbook, module, args.tasks)
+            for pipelining in PIPELINING:
+                wall = run_playbook(playbook, pipelining, args)
+                records.append(dict(components, pipelining=pipelining, tasks=args.tasks, wall=wall,
+                                    per_task_ms=(wall - baseline[pipelining]) * 1000 / args.tasks))
+    benchlib.print_table(records, ['module', 'pipelining', 'per_task_ms', 'payload_bytes', 'build_cold_ms', 'build_ms',
+                                   'exec_ms', 'import_ms', 'parse_ms', 'result_bytes'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
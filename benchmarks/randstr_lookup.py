@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Compare per-item ``randstr`` lookups with one batched call.
+
+Three generated playbooks each produce N tokens on localhost:
+
+    loop      a task looped N times, one lookup('randstr') per item
+    template  one template that calls lookup('randstr') N times
+    batched   one query('randstr', count=N)
+
+An empty playbook is timed as well and subtracted, so the reported per-token
+cost only covers generating the tokens.
+
+Example:
+
+    python benchmarks/randstr_lookup.py --counts 100,1000,10000 --length 20
+"""
+from argparse import ArgumentParser
+import os
+import sys
+
+import benchlib
+
+LOOKUP_DIR = os.path.join(benchlib.REPO_ROOT, 'tower_modules', 'lookup_plugins')
+
+PLAYBOOKS = {
+    'baseline': '''
+- hosts: localhost
+  gather_facts: false
+  tasks:
+    - set_fact:
+        tokens: []
+''',
+    'loop': '''
+- hosts: localhost
+  gather_facts: false
+  tasks:
+    - set_fact:
+        token: "{{{{ lookup('randstr', length={length}) }}}}"
+      loop: "{{{{ range({count}) | list }}}}"
+''',
+    'template': '''
+- hosts: localhost
+  gather_facts: false
+  tasks:
+    - set_fact:
+        tokens: "{{% set out = [] %}}{{% for i in range({count}) %}}{{% set _ = out.append(lookup('randstr', length={length})) %}}{{% endfor %}}{{{{ out }}}}"
+''',
+    'batched': '''
+- hosts: localhost
+  gather_facts: false
+  tasks:
+    - set_fact:
+        tokens: "{{{{ query('randstr', count={count}, length={length}) }}}}"
+''',
+}
+MODES = ('loop', 'template', 'batched')
+
+
+def time_playbook(path, trials):
+    walls = []
+    for _ in range(trials):
+        result = benchlib.run(['ansible-playbook', '-i', 'localhost,', '-c', 'local', path],
+                              env={'ANSIBLE_LOOKUP_PLUGINS': LOOKUP_DIR}, capture=True)
+        if result.returncode != 0:
+            sys.exit('{0} failed:\n{1}'.format(path, result.stdout[-4000:]))
+        walls.append(result.wall)
+    return benchlib.mean(walls)
+
+
+def write_playbook(scratch, mode, count, length):
+    path = os.path.join(scratch, '{0}-{1}.yml'.format(mode, count))
+    with open(path, 'w') as f:
+        f.write(PLAYBOOKS[mode].format(count=count, length=length))
+    return path
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--counts', type=benchlib.parse_int_list, default=[100, 1000],
+                        help='Comma separated token counts (default: 100,1000)')
+    parser.add_argument('--length', type=int, default=12)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    with benchlib.scratch_dir(prefix='randstr-') as scratch:
+        baseline = time_playbook(write_playbook(scratch, 'baseline', 0, args.length), args.trials)
+        for count in args.counts:
+            for mode in args.modes.split(','):
+                wall = time_playbook(write_playbook(scratch, mode, count, args.length), args.trials)
+                records.append({'mode': mode, 'count': count, 'length': args.length, 'wall': wall,
+                                'baseline_wall': baseline,
+                                'per_token_us': max(wall - baseline, 0.0) / count * 1e6 if count else 0.0})
+    benchlib.print_table(records, ['mode', 'count', 'wall', 'baseline_wall', 'per_token_us'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+"""Run the benchmark playbooks repeatably and fail on regressions against a stored baseline.
+
+Every selected playbook is run for every host and fork count against a
+generated inventory of local-connection hosts: ``--warmup`` untimed runs,
+then ``--trials`` timed runs. Each trial records the wall time, CPU, peak
+RSS of the controller and of its whole process tree, and host result events
+per second (``ok``/``changed``/``failed``/``skipping`` lines, loop items
+included). Records are appended to ``--output`` one per trial.
+
+With ``--baseline`` (earlier records, e.g. a saved ``--output``) the trials
+of each playbook/hosts/forks scenario are compared metric by metric. A
+metric has regressed when its mean moved in the bad direction by more than
+both ``--threshold`` of the baseline mean and ``--sigma`` standard errors of
+the difference of the means, so noisy metrics need more trials to flag.
+The script exits non-zero when anything regressed. ``--results`` compares
+stored records instead of running.
+
+``file_benchmark.yml`` writes ``--file-count`` paths per host under the
+scratch directory. ``debug-50.yml`` pauses for a second between its tasks,
+so it takes close to a minute per run.
+
+Example:
+
+    python benchmarks/regression.py --hosts 10 --forks 5 --trials 5 --output run.jsonl
+    python benchmarks/regression.py --hosts 10 --forks 5 --trials 5 --baseline run.jsonl --threshold 0.1
+"""
+from argparse import ArgumentParser
+from collections import deque
+import math
+import os
+import re
+import shutil
+import sys
+
+import benchlib
+
+PLAYBOOKS = ('file_benchmark.yml', 'ping-20.yml', 'debug-50.yml', 'setfact_50.yml', 'chatty_tasks.yml')
+SCENARIO = ('playbook', 'hosts', 'forks')
+# metric -> 1 when higher is worse, -1 when lower is worse
+METRICS = {'wall': 1, 'cpu': 1, 'maxrss_kb': 1, 'peak_tree_rss_kb': 1, 'events_per_sec': -1}
+
+_EVENT_RE = re.compile(br'^(ok|changed|failed|fatal|skipping): \[')
+
+
+def write_inventory(path, hosts, python):
+    lines = ['reg_host_{0:03d}'.format(i) for i in range(hosts)]
+    lines.extend(['', '[all:vars]', 'ansible_connection=local', 'ansible_python_interpreter={0}'.format(python)])
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def run_trial(playbook, hosts, forks, args, scratch):
+    inventory = os.path.join(scratch, 'hosts-{0}'.format(hosts))
+    if not os.path.exists(inventory):
+        write_inventory(inventory, hosts, args.python)
+    cmd = ['ansible-playbook', '-i', inventory, '-f', str(forks), playbook]
+    files = os.path.join(scratch, 'files')
+    if playbook == 'file_benchmark.yml':
+        cmd.extend(['-e', 'file_base_dir={0}/{{{{ inventory_hostname }}}}'.format(files),
+                    '-e', 'file_count={0}'.format(args.file_count)])
+    events = [0]
+    tail = deque(maxlen=40)
+
+    def on_line(line):
+        tail.append(line)
+        if _EVENT_RE.match(line):
+            events[0] += 1
+
+    result = benchlib.run_monitored(cmd, env={'ANSIBLE_FORCE_COLOR': '0'}, on_line=on_line)
+    shutil.rmtree(files, ignore_errors=True)
+    if result.returncode != 0:
+        sys.exit('{0} failed:\n{1}'.format(playbook, b''.join(tail).decode('utf-8', 'replace')))
+    return {'playbook': playbook, 'hosts': hosts, 'forks': forks, 'wall': result.wall, 'cpu': result.cpu,
+            'maxrss_kb': result.maxrss_kb, 'peak_tree_rss_kb': result.peak_tree_rss_kb, 'events': events[0],
+            'events_per_sec': events[0] / result.wall}
+
+
+def run_scenarios(args):
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    with benchlib.scratch_dir(prefix='regression-') as scratch:
+        for playbook in args.playbooks.split(','):
+            for hosts in args.hosts:
+                for forks in args.forks:
+                    for _ in range(args.warmup):
+                        run_trial(playbook, hosts, forks, args, scratch)
+                    for trial in range(args.trials):
+                        record = run_trial(playbook, hosts, forks, args, scratch)
+                        record.update({'trial': trial, 'label': args.label})
+                        records.append(record)
+    return records
+
+
+def by_scenario(records):
+    groups = {}
+    for record in records:
+        groups.setdefault(tuple(record[k] for k in SCENARIO), []).append(record)
+    return groups
+
+
+def compare(baseline, current, args):
+    ''' one row per scenario and metric, with status ok, regressed, improved or new '''
+    base_groups = by_scenario(baseline)
+    rows = []
+    for scenario, trials in sorted(by_scenario(current).items()):
+        base_trials = base_groups.get(scenario)
+        for metric in args.metrics.split(','):
+            values = [t[metric] for t in trials]
+            row = dict(zip(SCENARIO, scenario), metric=metric, mean=benchlib.mean(values), trials=len(values))
+            if not base_trials:
+                row['status'] = 'new'
+                rows.append(row)
+                continue
+            base_values = [t[metric] for t in base_trials]
+            base_mean = benchlib.mean(base_values)
+            # standard error of the difference of the two means
+            noise = args.sigma * math.sqrt(benchlib.stdev(base_values) ** 2 / len(base_values) +
+                                           benchlib.stdev(values) ** 2 / len(values))
+            worse_by = (row['mean'] - base_mean) * METRICS[metric]
+            limit = max(args.threshold * abs(base_mean), noise)
+            row['baseline'] = base_mean
+            if base_mean:
+                row['change_pct'] = (row['mean'] - base_mean) * 100.0 / abs(base_mean)
+                row['limit_pct'] = limit * 100.0 / abs(base_mean)
+            if worse_by > limit:
+                row['status'] = 'regressed'
+            elif -worse_by > limit:
+                row['status'] = 'improved'
+            else:
+                row['status'] = 'ok'
+            rows.append(row)
+    return rows
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--playbooks', default=','.join(PLAYBOOKS))
+    parser.add_argument('--hosts', type=benchlib.parse_int_list, default=[5])
+    parser.add_argument('--forks', type=benchlib.parse_int_list, default=[5])
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs before the trials (default: 1)')
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--file-count', type=int, default=100, help='file_count for file_benchmark.yml (default: 100)')
+    parser.add_argument('--python', default=sys.executable, help='ansible_python_interpreter of the hosts')
+    parser.add_argument('--label', default='', help='Stored with every record, e.g. a commit id')
+    parser.add_argument('--baseline', help='JSONL records to compare against')
+    parser.add_argument('--results', help='Compare these JSONL records instead of running the playbooks')
+    parser.add_argument('--metrics', default=','.join(sorted(METRICS)))
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help='Smallest relative change of a mean counted as a regression (default: 0.05)')
+    parser.add_argument('--sigma', type=float, default=3.0,
+                        help='Standard errors a mean must move by to count as a regression (default: 3)')
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    args = parser.parse_args()
+    unknown = set(args.metrics.split(',')) - set(METRICS)
+    if unknown:
+        parser.error('unknown metrics: {0}'.format(', '.join(sorted(unknown))))
+    return args
+
+
+def main():
+    args = parse_args()
+    records = benchlib.read_jsonl(args.results) if args.results else run_scenarios(args)
+    if args.output and not args.results:
+        benchlib.write_jsonl(args.output, records)
+    if not args.baseline:
+        rows = compare([], records, args)
+        benchlib.print_table(rows, list(SCENARIO) + ['metric', 'trials', 'mean'])
+        return
+    rows = compare(benchlib.read_jsonl(args.baseline), records, args)
+    benchlib.print_table(rows, list(SCENARIO) + ['metric', 'trials', 'baseline', 'mean', 'change_pct', 'limit_pct',
+                                                 'status'])
+    regressed = [row for row in rows if row['status'] == 'regressed']
+    if regressed:
+        sys.exit('{0} regression(s): {1}'.format(len(regressed), ', '.join(
+            '{0} {1}'.format(row['playbook'], row['metric']) for row in regressed)))
+
+
+if __name__ == '__main__':
+    main()
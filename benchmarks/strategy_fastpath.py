@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Compare the ``linear_fastpath`` strategy with ``linear`` and ``free``.
+
+Runs controller-only playbooks (by default ``setfact_50.yml`` and
+``debug_var_list.yml``) against N local hosts under each strategy and
+reports the mean wall time, CPU and peak RSS over several trials, plus the
+speedup relative to ``linear``. ``debug-50.yml`` also works but includes
+fifty one-second pauses, so it is not run by default.
+
+Example:
+
+    python benchmarks/strategy_fastpath.py --hosts 1,10,50 --forks 5 --trials 3
+"""
+from argparse import ArgumentParser
+import sys
+
+import benchlib
+
+STRATEGIES = ('linear', 'free', 'linear_fastpath')
+DEFAULT_PLAYBOOKS = ('setfact_50.yml', 'debug_var_list.yml')
+
+
+def run_playbook(playbook, strategy, hosts, forks):
+    inventory = ','.join('fastpath_{0:03d}'.format(i) for i in range(hosts)) + ','
+    result = benchlib.run(['ansible-playbook', '-i', inventory, '-c', 'local', '-f', str(forks), playbook],
+                          env={'ANSIBLE_STRATEGY': strategy}, capture=True)
+    if result.returncode != 0:
+        sys.exit('{0} failed under {1}:\n{2}'.format(playbook, strategy, result.stdout[-4000:]))
+    return result
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--playbooks', default=','.join(DEFAULT_PLAYBOOKS))
+    parser.add_argument('--strategies', default=','.join(STRATEGIES))
+    parser.add_argument('--hosts', type=benchlib.parse_int_list, default=[1, 10])
+    parser.add_argument('--forks', type=int, default=5)
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    for playbook in args.playbooks.split(','):
+        for hosts in args.hosts:
+            linear_wall = None
+            for strategy in args.strategies.split(','):
+                results = [run_playbook(playbook, strategy, hosts, args.forks) for _ in range(args.trials)]
+                wall = benchlib.mean([r.wall for r in results])
+                if strategy == 'linear':
+                    linear_wall = wall
+                records.append({'playbook': playbook, 'strategy': strategy, 'hosts': hosts, 'forks': args.forks,
+                                'trials': args.trials, 'wall': wall,
+                                'wall_stdev': benchlib.stdev([r.wall for r in results]),
+                                'cpu': benchlib.mean([r.cpu for r in results]),
+                                'maxrss_kb': max(r.maxrss_kb for r in results),
+                                'speedup_vs_linear': linear_wall / wall if linear_wall else None})
+    benchlib.print_table(records, ['playbook', 'hosts', 'strategy', 'wall', 'wall_stdev', 'cpu', 'maxrss_kb',
+                                   'speedup_vs_linear'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""Scheduling benchmark for strategies, forks and host counts.
+
+A generalization of ``free_waiter.yml``: every host runs the same number of
+sleep tasks, but each (host, task) duration is drawn up front from a seeded
+distribution and stored in the inventory, so every strategy sees exactly the
+same workload. The workload is run under ``linear``, ``free``,
+``host_pinned`` and ``serial`` (linear with a ``serial`` batch size, as in
+``serial.yml``) for every fork and host count.
+
+Timings come from the ``task_profile_jsonl`` callback. For each run:
+
+    makespan      first task start to last host result
+    lower_bound   max(longest host's total work, total work / min(forks, hosts))
+    efficiency    lower_bound / makespan
+    utilization   busy worker time / (makespan * min(forks, hosts))
+
+Distributions: ``fixed:S``, ``uniform:LOW:HIGH``, ``exponential:MEAN``,
+``lognormal:MU:SIGMA`` and ``bimodal:SHORT:LONG:P_LONG`` (seconds).
+
+Example:
+
+    python benchmarks/strategy_scheduling.py --hosts 4,16 --forks 2,4,8 --tasks 10 \\
+        --distribution uniform:0:2 --seed 42
+"""
+from argparse import ArgumentParser
+import json
+import os
+import random
+import sys
+
+import benchlib
+
+STRATEGIES = ('linear', 'free', 'host_pinned', 'serial')
+CALLBACK_DIR = os.path.join(benchlib.REPO_ROOT, 'callback_plugins')
+
+
+def sampler(spec, rng):
+    kind, _, params = spec.partition(':')
+    values = [float(v) for v in params.split(':')] if params else []
+    try:
+        if kind == 'fixed':
+            return lambda: values[0]
+        if kind == 'uniform':
+            return lambda: rng.uniform(values[0], values[1])
+        if kind == 'exponential':
+            return lambda: rng.expovariate(1.0 / values[0])
+        if kind == 'lognormal':
+            return lambda: rng.lognormvariate(values[0], values[1])
+        if kind == 'bimodal':
+            return lambda: values[1] if rng.random() < values[2] else values[0]
+    except IndexError:
+        pass
+    sys.exit('invalid distribution {0!r}; see --help'.format(spec))
+
+
+def durations(hosts, tasks, spec, seed):
+    rng = random.Random(seed)
+    draw = sampler(spec, rng)
+    return [[round(max(draw(), 0.0), 3) for _ in range(tasks)] for _ in range(hosts)]
+
+
+def write_inventory(path, workload):
+    hosts = dict(('sched_{0:03d}'.format(i), {'task_durations': d}) for i, d in enumerate(workload))
+    with open(path, 'w') as f:
+        json.dump({'all': {'hosts': hosts, 'vars': {'ansible_connection': 'local'}}}, f)
+
+
+def write_playbook(path, strategy, tasks, serial):
+    lines = ['- hosts: all', '  gather_facts: false']
+    if strategy == 'serial':
+        lines.append('  serial: {0}'.format(serial))
+    else:
+        lines.append('  strategy: {0}'.format(strategy))
+    lines.append('  tasks:')
+    for i in range(tasks):
+        lines.append('    - name: wait {0}'.format(i))
+        lines.append('      command: "sleep {{{{ task_durations[{0}] }}}}"'.format(i))
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def lower_bound(workload, forks):
+    slots = min(forks, len(workload))
+    total = sum(sum(host) for host in workload)
+    return max(max(sum(host) for host in workload), total / slots)
+
+
+def measure(strategy, hosts, forks, args, scratch):
+    workload = durations(hosts, args.tasks, args.distribution, args.seed)
+    inventory = os.path.join(scratch, 'inventory-{0}.json'.format(hosts))
+    playbook = os.path.join(scratch, '{0}.yml'.format(strategy))
+    profile = os.path.join(scratch, 'profile-{0}-{1}-{2}.jsonl'.format(strategy, hosts, forks))
+    write_inventory(inventory, workload)
+    write_playbook(playbook, strategy, args.tasks, args.serial)
+    result = benchlib.run(['ansible-playbook', '-i', inventory, '-f', str(forks), playbook],
+                          env={'ANSIBLE_CALLBACK_PLUGINS': CALLBACK_DIR,
+                               'ANSIBLE_CALLBACK_WHITELIST': 'task_profile_jsonl',
+                               'ANSIBLE_CALLBACKS_ENABLED': 'task_profile_jsonl',
+                               'TASK_PROFILE_JSONL_PATH': profile}, capture=True)
+    if result.returncode != 0:
+        sys.exit('{0} run failed:\n{1}'.format(strategy, result.stdout[-4000:]))
+
+    events = benchlib.read_jsonl(profile)
+    first_start = min(e['ts'] - e['execute'] - e['queue_wait'] for e in events)
+    makespan = max(e['ts'] for e in events) - first_start
+    busy = sum(e['execute'] for e in events)
+    bound = lower_bound(workload, forks)
+    slots = min(forks, hosts)
+    return {'strategy': strategy, 'hosts': hosts, 'forks': forks, 'tasks': args.tasks,
+            'serial': args.serial if strategy == 'serial' else None,
+            'distribution': args.distribution, 'seed': args.seed, 'wall': result.wall,
+            'makespan': makespan, 'lower_bound': bound, 'efficiency': bound / makespan if makespan else None,
+            'utilization': busy / (makespan * slots) if makespan else None,
+            'work': sum(sum(host) for host in workload)}
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--strategies', default=','.join(STRATEGIES))
+    parser.add_argument('--hosts', type=benchlib.parse_int_list, default=[4, 16])
+    parser.add_argument('--forks', type=benchlib.parse_int_list, default=[2, 5])
+    parser.add_argument('--tasks', type=int, default=10)
+    parser.add_argument('--serial', type=int, default=2, help='Batch size for the serial strategy (default: 2)')
+    parser.add_argument('--distribution', default='uniform:0:2')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    records = []
+    with benchlib.scratch_dir(prefix='strategy-scheduling-') as scratch:
+        for hosts in args.hosts:
+            for forks in args.forks:
+                for strategy in args.strategies.split(','):
+                    records.append(measure(strategy, hosts, forks, args, scratch))
+    benchlib.print_table(records, ['hosts', 'forks', 'strategy', 'makespan', 'lower_bound', 'efficiency',
+                                   'utilization', 'wall'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""Compare stock host_group_vars against a precompiled vars_bundle.
+
+Generates a group_vars/host_vars tree for N hosts spread over G groups,
+compiles it with ``utils/compile_vars_bundle.py`` and times
+``ansible-inventory`` resolving it two ways:
+
+    stock   host_group_vars, which finds and parses one or more files per
+            host and group
+    bundle  vars_bundle alone, which maps vars.bundle and decodes only the
+            entities asked for
+
+Each mode runs ``--list`` (vars for every host) and ``--host`` for one host.
+The ``--list`` outputs of both modes are compared, so a bundle that does
+not reproduce the tree shows up as ``matches: False``.
+
+Example:
+
+    python benchmarks/vars_bundle.py --hosts 1000,10000 --groups 50 --vars 20 --layout dir
+"""
+from argparse import ArgumentParser
+import json
+import os
+import sys
+
+import benchlib
+
+VARS_PLUGIN_DIR = os.path.join(benchlib.REPO_ROOT, 'vars_plugins')
+COMPILER = os.path.join(benchlib.REPO_ROOT, 'utils', 'compile_vars_bundle.py')
+MODES = ('stock', 'bundle')
+
+
+def write_vars(root, name, values, layout):
+    if layout == 'dir':
+        path = os.path.join(root, name)
+        os.makedirs(path)
+        path = os.path.join(path, 'main.yml')
+    else:
+        path = os.path.join(root, name + '.yml')
+    with open(path, 'w') as f:
+        for key, value in values:
+            f.write('{0}: {1}\n'.format(key, json.dumps(value)))
+
+
+def generate_tree(scratch, hosts, args):
+    base = os.path.join(scratch, 'tree-{0}'.format(hosts))
+    for subdir in ('group_vars', 'host_vars'):
+        os.makedirs(os.path.join(base, subdir))
+    groups = ['bundle_group_{0}'.format(g) for g in range(args.groups)]
+    members = dict((g, []) for g in groups)
+    for h in range(hosts):
+        host = 'bundle_host_{0:06d}'.format(h)
+        for k in range(args.groups_per_host):
+            members[groups[(h + k) % len(groups)]].append(host)
+        write_vars(os.path.join(base, 'host_vars'), host,
+                   [('host_var_{0}'.format(i), 'host-{0}-{1}'.format(h, i)) for i in range(args.vars)], args.layout)
+    for g, group in enumerate(groups):
+        write_vars(os.path.join(base, 'group_vars'), group,
+                   [('group_var_{0}'.format(i), {'group': g, 'values': list(range(i % 5))})
+                    for i in range(args.vars)], args.layout)
+    write_vars(os.path.join(base, 'group_vars'), 'all', [('ansible_connection', 'local')], args.layout)
+    with open(os.path.join(base, 'hosts'), 'w') as f:
+        for group in groups:
+            f.write('[{0}]\n{1}\n'.format(group, '\n'.join(members[group])))
+    return base
+
+
+def compile_bundle(base):
+    result = benchlib.run([sys.executable, COMPILER, base], capture=True)
+    if result.returncode != 0:
+        sys.exit('compiling the bundle failed:\n{0}'.format(result.stderr[-4000:]))
+    return result
+
+
+def measure(mode, base, hosts, args):
+    env = {'ANSIBLE_VARS_PLUGINS': VARS_PLUGIN_DIR}
+    if mode == 'bundle':
+        env['ANSIBLE_VARS_ENABLED'] = 'vars_bundle'
+    records = []
+    outputs = {}
+    for query in (['--list'], ['--host', 'bundle_host_000000']):
+        results = []
+        for _ in range(args.trials):
+            result = benchlib.run(['ansible-inventory', '-i', 'hosts'] + query, env=env, cwd=base, capture=True)
+            if result.returncode != 0:
+                sys.exit('{0} {1} failed:\n{2}'.format(mode, query[0], result.stderr[-4000:]))
+            results.append(result)
+        outputs[query[0]] = json.loads(results[-1].stdout)
+        records.append({'mode': mode, 'query': query[0], 'hosts': hosts, 'groups': args.groups,
+                        'vars': args.vars, 'layout': args.layout, 'trials': args.trials,
+                        'wall': benchlib.mean([r.wall for r in results]),
+                        'wall_stdev': benchlib.stdev([r.wall for r in results]),
+                        'cpu': benchlib.mean([r.cpu for r in results]),
+                        'maxrss_kb': max(r.maxrss_kb for r in results)})
+    return records, outputs['--list']
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--hosts', type=benchlib.parse_int_list, default=[100, 1000])
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--groups-per-host', type=int, default=2)
+    parser.add_argument('--vars', type=int, default=10, help='Vars per host and per group file (default: 10)')
+    parser.add_argument('--layout', choices=('file', 'dir'), default='file',
+                        help='<name>.yml files or <name>/main.yml directories (default: file)')
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-inventory')
+    records = []
+    with benchlib.scratch_dir(prefix='vars-bundle-') as scratch:
+        for hosts in args.hosts:
+            base = generate_tree(scratch, hosts, args)
+            compiled = compile_bundle(base)
+            lists = {}
+            for mode in MODES:
+                mode_records, lists[mode] = measure(mode, base, hosts, args)
+                records.extend(mode_records)
+            for record in records[-2 * len(MODES):]:
+                record['matches'] = lists['stock'] == lists['bundle']
+                record['compile_wall'] = compiled.wall
+                record['bundle_bytes'] = os.path.getsize(os.path.join(base, 'vars.bundle'))
+    benchlib.print_table(records, ['hosts', 'mode', 'query', 'wall', 'wall_stdev', 'cpu', 'maxrss_kb',
+                                   'compile_wall', 'matches'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
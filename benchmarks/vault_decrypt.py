@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""Compare eager, stock inline and lazy cached vault decryption.
+
+Generates N vaulted vars spread across M vault ids and a playbook whose one
+template reads only K of them, R times each, then times ansible-playbook with
+the vars stored in three layouts:
+
+    eager   one whole-file vaulted group_vars/all/<vault id>.yml per vault id;
+            every value is decrypted when the file is loaded
+    inline  inline !vault values in group_vars/all/vars.yml; values are
+            decrypted when read, again on every read
+    lazy    the same inline values in lazy_vault_vars/group_vars/all.yml,
+            loaded by the lazy_vault_vars vars plugin, which decrypts each
+            value at most once per process
+
+Encrypting the inputs needs Ansible's vault library, so Ansible must be
+importable by the Python running this script.
+
+Example:
+
+    python benchmarks/vault_decrypt.py --vars 1000 --vault-ids 4 --used 10 --reads 5
+"""
+from argparse import ArgumentParser
+import os
+import random
+import sys
+
+import benchlib
+
+VARS_PLUGIN_DIR = os.path.join(benchlib.REPO_ROOT, 'vars_plugins')
+LAYOUTS = ('eager', 'inline', 'lazy')
+
+
+def vault_ids(count):
+    return ['bench{0}'.format(i) for i in range(count)]
+
+
+def make_vault(ids, scratch):
+    try:
+        from ansible.parsing.vault import VaultLib, VaultSecret
+    except ImportError:
+        sys.exit('ansible must be importable to generate vaulted vars')
+    secrets = []
+    cli = []
+    for vid in ids:
+        password = 'secret-{0}'.format(vid)
+        path = os.path.join(scratch, 'password-{0}'.format(vid))
+        with open(path, 'w') as f:
+            f.write(password + '\n')
+        secrets.append((vid, VaultSecret(password.encode('utf-8'))))
+        cli.extend(['--vault-id', '{0}@{1}'.format(vid, path)])
+    return VaultLib(secrets), dict(secrets), cli
+
+
+def inline_yaml(name, ciphertext):
+    body = '\n'.join('  ' + line for line in ciphertext.decode('utf-8').splitlines())
+    return '{0}: !vault |\n{1}\n'.format(name, body)
+
+
+def write_layouts(args, scratch):
+    ids = vault_ids(args.vault_ids)
+    vault, secrets, cli = make_vault(ids, scratch)
+    names = ['vaulted_var_{0}'.format(i) for i in range(args.vars)]
+    owner = dict((name, ids[i % len(ids)]) for i, name in enumerate(names))
+    values = dict((name, 'value-of-{0}-'.format(name) + 'x' * args.value_length) for name in names)
+
+    inline = ''.join(inline_yaml(n, vault.encrypt(values[n], secrets[owner[n]], vault_id=owner[n])) for n in names)
+    for layout in LAYOUTS:
+        root = os.path.join(scratch, layout)
+        if layout == 'eager':
+            os.makedirs(os.path.join(root, 'group_vars', 'all'))
+            for vid in ids:
+                plain = ''.join('{0}: "{1}"\n'.format(n, values[n]) for n in names if owner[n] == vid)
+                with open(os.path.join(root, 'group_vars', 'all', '{0}.yml'.format(vid)), 'wb') as f:
+                    f.write(vault.encrypt(plain, secrets[vid], vault_id=vid))
+        elif layout == 'inline':
+            os.makedirs(os.path.join(root, 'group_vars', 'all'))
+            with open(os.path.join(root, 'group_vars', 'all', 'vars.yml'), 'w') as f:
+                f.write(inline)
+        else:
+            os.makedirs(os.path.join(root, 'lazy_vault_vars', 'group_vars'))
+            with open(os.path.join(root, 'lazy_vault_vars', 'group_vars', 'all.yml'), 'w') as f:
+                f.write(inline)
+        with open(os.path.join(root, 'hosts'), 'w') as f:
+            f.write('localhost ansible_connection=local\n')
+
+    # every read sits in one template, so they all happen in the same worker process
+    used = random.Random(args.seed).sample(names, min(args.used, len(names)))
+    reads = ', '.join(used * args.reads)
+    playbook = ('- hosts: all\n  gather_facts: false\n  tasks:\n'
+                '    - debug:\n        msg: "{{{{ [{0}] | join(\',\') | length }}}}"\n'.format(reads))
+    for layout in LAYOUTS:
+        with open(os.path.join(scratch, layout, 'read_vaulted.yml'), 'w') as f:
+            f.write(playbook)
+    return cli
+
+
+def measure(layout, cli, args, scratch):
+    root = os.path.join(scratch, layout)
+    env = {'ANSIBLE_VARS_PLUGINS': VARS_PLUGIN_DIR}
+    if layout == 'lazy':
+        env['ANSIBLE_VARS_ENABLED'] = 'host_group_vars,lazy_vault_vars'
+    results = []
+    for _ in range(args.trials):
+        result = benchlib.run(['ansible-playbook', '-i', 'hosts', 'read_vaulted.yml'] + cli,
+                              env=env, cwd=root, capture=True)
+        if result.returncode != 0:
+            sys.exit('{0} layout failed:\n{1}'.format(layout, result.stdout[-4000:]))
+        results.append(result)
+    return {'layout': layout, 'vars': args.vars, 'vault_ids': args.vault_ids, 'used': args.used,
+            'reads': args.reads, 'trials': args.trials,
+            'wall': benchlib.mean([r.wall for r in results]),
+            'wall_stdev': benchlib.stdev([r.wall for r in results]),
+            'cpu': benchlib.mean([r.cpu for r in results]),
+            'maxrss_kb': max(r.maxrss_kb for r in results)}
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--vars', type=int, default=500, help='Number of vaulted vars (default: 500)')
+    parser.add_argument('--vault-ids', type=int, default=3, help='Number of vault ids (default: 3)')
+    parser.add_argument('--used', type=int, default=5, help='Vars read by the playbook (default: 5)')
+    parser.add_argument('--reads', type=int, default=5, help='Times each used var is read (default: 5)')
+    parser.add_argument('--value-length', type=int, default=32)
+    parser.add_argument('--layouts', default=','.join(LAYOUTS))
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Append result records to this JSONL file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    benchlib.require_executable('ansible-playbook')
+    with benchlib.scratch_dir(prefix='vault-decrypt-') as scratch:
+        cli = write_layouts(args, scratch)
+        records = [measure(layout, cli, args, scratch) for layout in args.layouts.split(',')]
+    benchlib.print_table(records, ['layout', 'vars', 'vault_ids', 'used', 'reads', 'wall', 'wall_stdev', 'cpu',
+                                   'maxrss_kb'])
+    if args.output:
+        benchlib.write_jsonl(args.output, records)
+
+
+if __name__ == '__main__':
+    main()
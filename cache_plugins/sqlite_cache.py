@@ -0,0 +1,312 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    cache: sqlite_cache
+    short_description: Cache in one local SQLite file, with per-key TTL, LRU size cap and compressed values
+    description:
+        - Stores every key (one per host for facts) as a row of a single SQLite database instead of one file per
+          key, so large host counts do not mean a directory of thousands of small files.
+        - Values are serialized as JSON (the same encoding as C(jsonfile)) and compressed with zlib.
+        - Each row has its own expiry; C(set) and C(set_many) take an optional C(ttl) that overrides C(_timeout).
+        - When C(max_size) is set, the least recently read or written keys are evicted once a write takes the
+          compressed values over it, until they fit. The cap and the eviction apply to the keys under this
+          instance's C(_prefix) only, so several prefixes can share one file.
+        - The stored size is read from the file at the first write of a connection and kept up to date by this
+          instance's own writes and deletes, so a write by another process is only counted at the next eviction.
+        - Reads record the access time for LRU at most every few seconds per key, so a key read over and over
+          does not cost a write each time.
+        - C(get_many) and C(set_many) read or write any number of keys in one transaction.
+        - Enable with C(ANSIBLE_CACHE_PLUGINS=cache_plugins) and C(ANSIBLE_CACHE_PLUGIN=sqlite_cache).
+    version_added: "2.9"
+    author: Ansible Tower QE
+    options:
+      _uri:
+        required: True
+        description:
+          - Path of the SQLite file. If it is a directory, C(ansible_cache.sqlite) inside it is used.
+        env:
+          - name: ANSIBLE_CACHE_PLUGIN_CONNECTION
+        ini:
+          - key: fact_caching_connection
+            section: defaults
+        type: path
+      _prefix:
+        description: User defined prefix for the stored keys
+        env:
+          - name: ANSIBLE_CACHE_PLUGIN_PREFIX
+        ini:
+          - key: fact_caching_prefix
+            section: defaults
+      _timeout:
+        default: 86400
+        description: Default expiration timeout in seconds; 0 never expires
+        env:
+          - name: ANSIBLE_CACHE_PLUGIN_TIMEOUT
+        ini:
+          - key: fact_caching_timeout
+            section: defaults
+        type: integer
+      max_size:
+        default: 0
+        description: Cap in bytes on the stored (compressed) values under C(_prefix); 0 is unlimited
+        env:
+          - name: ANSIBLE_CACHE_SQLITE_MAX_SIZE
+        ini:
+          - key: max_size
+            section: cache_sqlite_cache
+        type: integer
+      compression_level:
+        default: 6
+        description: zlib compression level for stored values; 0 stores them uncompressed
+        env:
+          - name: ANSIBLE_CACHE_SQLITE_COMPRESSION_LEVEL
+        ini:
+          - key: compression_level
+            section: cache_sqlite_cache
+        type: integer
+'''
+
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from ansible import constants as C
+from ansible.errors import AnsibleError
+from ansible.module_utils._text import to_native, to_text
+from ansible.parsing.ajson import AnsibleJSONDecoder, AnsibleJSONEncoder
+from ansible.plugins.cache import BaseCacheModule
+
+DEFAULT_FILENAME = 'ansible_cache.sqlite'
+# SQLite's default limit on bound parameters is 999
+_BATCH = 500
+# a read only updates a key's accessed time when it is older than this many seconds
+_TOUCH_INTERVAL = 5
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    compressed INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+'''
+
+
+def _batches(items):
+    for start in range(0, len(items), _BATCH):
+        yield items[start:start + _BATCH]
+
+
+class CacheModule(BaseCacheModule):
+    """
+    A caching module backed by a single SQLite file.
+    """
+
+    def __init__(self, *args, **kwargs):
+        try:
+            super(CacheModule, self).__init__(*args, **kwargs)
+            uri = self.get_option('_uri')
+            self._prefix = self.get_option('_prefix') or ''
+            self._timeout = float(self.get_option('_timeout'))
+            self._max_size = int(self.get_option('max_size'))
+            self._level = int(self.get_option('compression_level'))
+        except KeyError:
+            uri = C.CACHE_PLUGIN_CONNECTION
+            self._prefix = C.CACHE_PLUGIN_PREFIX or ''
+            self._timeout = float(C.CACHE_PLUGIN_TIMEOUT)
+            self._max_size = 0
+            self._level = 6
+        if not uri:
+            raise AnsibleError("error, 'sqlite_cache' cache plugin requires the 'fact_caching_connection' config "
+                               "option to be set (to a writeable file or directory path)")
+        uri = os.path.expanduser(os.path.expandvars(uri))
+        if os.path.isdir(uri):
+            uri = os.path.join(uri, DEFAULT_FILENAME)
+        self._path = uri
+        # key -> (value, expiry time or None, accessed time), so memory hits honour the same TTL and
+        # LRU bookkeeping as the database
+        self._cache = {}
+        # size of the stored values under our prefix, taken at the first write of a connection
+        self._size = None
+        self._db = None
+        self._pid = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_db'] = None
+        return state
+
+    @property
+    def db(self):
+        # workers inherit the controller's instance; a connection must not cross a fork
+        if self._db is None or self._pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            try:
+                if directory and not os.path.isdir(directory):
+                    os.makedirs(directory)
+                self._db = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute('PRAGMA synchronous=NORMAL')
+                self._db.executescript(_SCHEMA)
+            except (OSError, sqlite3.Error) as e:
+                raise AnsibleError("error in 'sqlite_cache' cache plugin while opening %s: %s"
+                                   % (self._path, to_native(e)))
+            self._pid = os.getpid()
+            self._size = None
+        return self._db
+
+    def _expires(self, ttl):
+        ttl = self._timeout if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+    def _encode(self, value):
+        data = json.dumps(value, cls=AnsibleJSONEncoder, sort_keys=True).encode('utf-8')
+        if self._level:
+            return zlib.compress(data, self._level), 1
+        return data, 0
+
+    def _decode(self, data, compressed):
+        data = bytes(data)
+        if compressed:
+            data = zlib.decompress(data)
+        return json.loads(to_text(data), cls=AnsibleJSONDecoder)
+
+    def _cached(self, key, now):
+        ''' the (value, expires, accessed) kept in memory for a live key, or None '''
+        entry = self._cache.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._cache[key]
+            return None
+        return entry
+
+    def get_many(self, keys):
+        ''' values of every live key in keys, read in one transaction; missing and expired keys are left out '''
+        now = time.time()
+        found = {}
+        # memory hits are reads too, as far as LRU eviction is concerned
+        touched = []
+        for key in keys:
+            entry = self._cached(key, now)
+            if entry is not None:
+                found[key] = entry[0]
+                if now - entry[2] >= _TOUCH_INTERVAL:
+                    touched.append(key)
+        wanted = [self._prefix + k for k in keys if k not in found]
+        if not wanted and not touched:
+            return found
+        db = self.db
+        with db:
+            db.execute('BEGIN')
+            for batch in _batches(wanted):
+                rows = db.execute('SELECT key, value, compressed, expires, accessed FROM cache WHERE key IN (%s) '
+                                  'AND (expires IS NULL OR expires > ?)' % ','.join('?' * len(batch)),
+                                  batch + [now]).fetchall()
+                for stored, value, compressed, expires, accessed in rows:
+                    key = stored[len(self._prefix):]
+                    found[key] = self._decode(value, compressed)
+                    self._cache[key] = (found[key], expires, accessed)
+                    if now - accessed >= _TOUCH_INTERVAL:
+                        touched.append(key)
+            for batch in _batches(touched):
+                db.execute('UPDATE cache SET accessed = ? WHERE key IN (%s)' % ','.join('?' * len(batch)),
+                           [now] + [self._prefix + k for k in batch])
+        for key in touched:
+            self._cache[key] = self._cache[key][:2] + (now,)
+        return found
+
+    def set_many(self, values, ttl=None):
+        ''' store every key and value of a dict in one transaction '''
+        now = time.time()
+        expires = self._expires(ttl)
+        rows = []
+        for key, value in values.items():
+            data, compressed = self._encode(value)
+            rows.append((self._prefix + key, sqlite3.Binary(data), compressed, len(data), expires, now))
+        self._cache.update((key, (value, expires, now)) for key, value in values.items())
+        db = self.db
+        with db:
+            db.execute('BEGIN')
+            if self._size is None:
+                self._size = self._prune(db, now)
+            for batch in _batches([row[0] for row in rows]):
+                self._size -= db.execute('SELECT COALESCE(SUM(size), 0) FROM cache WHERE key IN (%s)'
+                                         % ','.join('?' * len(batch)), batch).fetchone()[0]
+            db.executemany('INSERT OR REPLACE INTO cache (key, value, compressed, size, expires, accessed) '
+                           'VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self._size += sum(row[3] for row in rows)
+            if self._max_size and self._size > self._max_size:
+                self._evict(db, now)
+
+    def _delete(self, db, stored_keys):
+        for batch in _batches(stored_keys):
+            db.execute('DELETE FROM cache WHERE key IN (%s)' % ','.join('?' * len(batch)), batch)
+        for stored in stored_keys:
+            self._cache.pop(stored[len(self._prefix):], None)
+
+    def _prune(self, db, now):
+        ''' drop the expired keys under our prefix and return the size of the rest '''
+        mine = 'substr(key, 1, ?) = ?'
+        params = (len(self._prefix), self._prefix)
+        self._delete(db, [stored for (stored,) in db.execute('SELECT key FROM cache WHERE %s AND expires <= ?' % mine,
+                                                             params + (now,)).fetchall()])
+        return db.execute('SELECT COALESCE(SUM(size), 0) FROM cache WHERE ' + mine, params).fetchone()[0]
+
+    def _evict(self, db, now):
+        ''' drop expired keys, then the least recently used ones over max_size; only keys under our prefix '''
+        total = self._prune(db, now)
+        evicted = []
+        if total > self._max_size:
+            for stored, size in db.execute('SELECT key, size FROM cache WHERE substr(key, 1, ?) = ? '
+                                           'ORDER BY accessed, key', (len(self._prefix), self._prefix)):
+                evicted.append(stored)
+                total -= size
+                if total <= self._max_size:
+                    break
+        self._delete(db, evicted)
+        self._size = total
+
+    def get(self, key):
+        found = self.get_many([key])
+        if key not in found:
+            raise KeyError
+        return found[key]
+
+    def set(self, key, value, ttl=None):
+        self.set_many({key: value}, ttl=ttl)
+
+    def keys(self):
+        rows = self.db.execute('SELECT key FROM cache WHERE substr(key, 1, ?) = ? '
+                               'AND (expires IS NULL OR expires > ?)',
+                               (len(self._prefix), self._prefix, time.time())).fetchall()
+        return [stored[len(self._prefix):] for (stored,) in rows]
+
+    def contains(self, key):
+        if self._cached(key, time.time()) is not None:
+            return True
+        row = self.db.execute('SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                              (self._prefix + key, time.time())).fetchone()
+        return row is not None
+
+    def delete(self, key):
+        self._cache.pop(key, None)
+        with self.db as db:
+            row = db.execute('SELECT size FROM cache WHERE key = ?', (self._prefix + key,)).fetchone()
+            db.execute('DELETE FROM cache WHERE key = ?', (self._prefix + key,))
+            if row is not None and self._size is not None:
+                self._size -= row[0]
+
+    def flush(self):
+        self._cache = {}
+        with self.db as db:
+            db.execute('DELETE FROM cache WHERE substr(key, 1, ?) = ?', (len(self._prefix), self._prefix))
+        self._size = 0
+
+    def copy(self):
+        return self.get_many(self.keys())
@@ -0,0 +1,196 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    callback: task_profile_jsonl
+    type: aggregate
+    short_description: Records per-task, per-host latency as JSONL and prints percentile summaries
+    version_added: "2.8"
+    description:
+        - Writes one JSON line per host result with high resolution timings for each stage the controller can see.
+        - C(queue_wait) is the time from the task starting to the worker process being forked for the host,
+          i.e. time spent waiting for a free fork (the strategy fires C(v2_runner_on_start) just before the fork).
+        - C(execute) is the time from the fork to the result callback, covering worker start, connection, module
+          transfer and execution, result transfer and the strategy's handling of the result.
+        - C(module) is the module's own runtime when it reports one (C(delta), C(start)/C(end) or C(elapsed)),
+          and C(dispatch) is C(execute) minus C(module), the per-task overhead around the module.
+        - Worker start and the strategy's result handling cannot be timed separately from a callback; nothing is
+          reported from inside the worker before its result, and results are dequeued without a callback.
+        - With C(result_size) enabled, C(result_bytes) is the JSON size of each result. Serializing every result
+          costs time that grows with result size, so it is off by default.
+        - At the end of each play, p50/p95/p99 of every stage and the slowest tasks are printed.
+    requirements:
+      - enable in configuration
+    options:
+      output_path:
+        description: JSONL file to append records to.
+        default: ~/.ansible/task_profile.jsonl
+        env:
+          - name: TASK_PROFILE_JSONL_PATH
+        ini:
+          - section: callback_task_profile_jsonl
+            key: output_path
+      result_size:
+        description: Record the serialized size of each result as C(result_bytes).
+        type: bool
+        default: False
+        env:
+          - name: TASK_PROFILE_JSONL_RESULT_SIZE
+        ini:
+          - section: callback_task_profile_jsonl
+            key: result_size
+      summary_tasks:
+        description: Number of slowest tasks listed in each play summary.
+        type: int
+        default: 10
+        env:
+          - name: TASK_PROFILE_JSONL_SUMMARY_TASKS
+        ini:
+          - section: callback_task_profile_jsonl
+            key: summary_tasks
+'''
+
+import json
+import math
+import os
+import time
+from datetime import datetime
+
+from ansible.plugins.callback import CallbackBase
+
+try:
+    clock = time.perf_counter
+except AttributeError:
+    clock = time.time
+
+STAGES = ('queue_wait', 'execute', 'module', 'dispatch')
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = int(math.floor(rank)), int(math.ceil(rank))
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def module_runtime(result):
+    ''' module-reported runtime in seconds, from command-style start/end or delta fields '''
+    fmt = '%Y-%m-%d %H:%M:%S.%f'
+    try:
+        if result.get('start') and result.get('end'):
+            return (datetime.strptime(result['end'], fmt) - datetime.strptime(result['start'], fmt)).total_seconds()
+        if result.get('delta'):
+            hours, minutes, seconds = result['delta'].split(':')
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except (TypeError, ValueError, AttributeError):
+        pass
+    if isinstance(result.get('elapsed'), (int, float)):
+        return float(result['elapsed'])
+    return None
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'task_profile_jsonl'
+    CALLBACK_NEEDS_WHITELIST = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self._output = None
+        self._play = None
+        self._task_start = {}
+        self._host_start = {}
+        self._records = []
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        path = os.path.expanduser(self.get_option('output_path'))
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._output = open(path, 'a')
+
+    def _write(self, record):
+        if self._output is not None:
+            self._output.write(json.dumps(record, sort_keys=True) + '\n')
+
+    def v2_playbook_on_play_start(self, play):
+        self._summarize()
+        # every task of the previous play has finished on every host by now
+        self._task_start.clear()
+        self._host_start.clear()
+        self._play = play.get_name()
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._task_start[task._uuid] = clock()
+
+    v2_playbook_on_handler_task_start = v2_playbook_on_task_start
+
+    def v2_runner_on_start(self, host, task):
+        self._host_start[(task._uuid, host.get_name())] = clock()
+
+    def _record(self, result, status):
+        received = clock()
+        task = result._task
+        host = result._host.get_name()
+        task_start = self._task_start.get(task._uuid, received)
+        host_start = self._host_start.pop((task._uuid, host), task_start)
+        record = {
+            'ts': time.time(),
+            'play': self._play,
+            'task': task.get_name(),
+            'task_uuid': task._uuid,
+            'action': task.action,
+            'host': host,
+            'status': status,
+            'queue_wait': host_start - task_start,
+            'execute': received - host_start,
+            'module': module_runtime(result._result),
+            'result_bytes': None,
+        }
+        record['dispatch'] = record['execute'] - record['module'] if record['module'] is not None else None
+        if self.get_option('result_size'):
+            record['result_bytes'] = len(json.dumps(result._result, default=str))
+        self._records.append(record)
+        self._write(record)
+
+    def v2_runner_on_ok(self, result):
+        self._record(result, 'ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, 'ignored' if ignore_errors else 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self._record(result, 'skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self._record(result, 'unreachable')
+
+    def _summarize(self):
+        if not self._records:
+            return
+        records, self._records = self._records, []
+        self._display.banner('TASK PROFILE [{0}]'.format(self._play or ''))
+        self._display.display('{0:<12} {1:>8} {2:>10} {3:>10} {4:>10}'.format('stage', 'count', 'p50', 'p95', 'p99'))
+        for stage in STAGES:
+            values = [r[stage] for r in records if r[stage] is not None]
+            if values:
+                self._display.display('{0:<12} {1:>8} {2:>10.4f} {3:>10.4f} {4:>10.4f}'.format(
+                    stage, len(values), percentile(values, 50), percentile(values, 95), percentile(values, 99)))
+
+        per_task = {}
+        for r in records:
+            per_task.setdefault((r['task_uuid'], r['task']), []).append(r['queue_wait'] + r['execute'])
+        slowest = sorted(per_task.items(), key=lambda item: sum(item[1]), reverse=True)
+        self._display.display('slowest tasks (total host seconds, p95 per host):')
+        for (_, name), values in slowest[:self.get_option('summary_tasks')]:
+            self._display.display('  {0:>10.4f}s {1:>10.4f}s  {2}'.format(sum(values), percentile(values, 95), name))
+
+    def v2_playbook_on_stats(self, stats):
+        self._summarize()
+        if self._output is not None:
+            self._output.close()
+            self._output = None
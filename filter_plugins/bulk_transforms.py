@@ -0,0 +1,204 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import operator
+import re
+
+from ansible.errors import AnsibleFilterError
+from ansible.module_utils.common._collections_compat import Mapping, Sequence
+from ansible.module_utils.six import string_types
+from ansible.module_utils.six.moves import zip_longest
+
+_MISSING = object()
+_REQUIRED = object()
+
+
+def _lookup(item, key, default=_REQUIRED):
+    ''' item[key], where key may be a dotted path into nested dicts '''
+    value = item
+    for part in key.split('.') if isinstance(key, string_types) else [key]:
+        try:
+            value = value[part]
+        except (KeyError, IndexError, TypeError):
+            if default is _REQUIRED:
+                raise AnsibleFilterError('%r has no key %r' % (item, key))
+            return default
+    return value
+
+
+def _is_list(value):
+    return isinstance(value, Sequence) and not isinstance(value, string_types)
+
+
+def group_by_key(items, key, default=_REQUIRED):
+    ''' {value of key: [items with that value]}, keeping item order within each group '''
+    groups = {}
+    for item in items:
+        value = _lookup(item, key, default)
+        try:
+            groups.setdefault(value, []).append(item)
+        except TypeError:
+            raise AnsibleFilterError('group_by_key: value %r for key %r cannot be a group key' % (value, key))
+    return groups
+
+
+def index_by_key(items, key, unique=True):
+    ''' {value of key: item}; with unique, a repeated value is an error instead of last-wins '''
+    index = {}
+    for item in items:
+        value = _lookup(item, key)
+        try:
+            if unique and value in index:
+                raise AnsibleFilterError('index_by_key: duplicate value %r for key %r' % (value, key))
+            index[value] = item
+        except TypeError:
+            raise AnsibleFilterError('index_by_key: value %r for key %r cannot be an index key' % (value, key))
+    return index
+
+
+class _UniqueList(object):
+    ''' a list merged with append_unique, with the set of its hashable values kept alongside '''
+
+    def __init__(self, values):
+        self.values = []
+        self._seen = set()
+        self._unhashable = []
+        self.extend(values)
+
+    def extend(self, values):
+        for value in values:
+            try:
+                if value in self._seen:
+                    continue
+                self._seen.add(value)
+            except TypeError:
+                # dicts and lists fall back to a scan of the other unhashable values only
+                if value in self._unhashable:
+                    continue
+                self._unhashable.append(value)
+            self.values.append(value)
+
+
+def _deep_merge(base, other, list_merge, uniques):
+    for key, value in other.items():
+        current = base.get(key, _MISSING)
+        if isinstance(current, Mapping) and isinstance(value, Mapping):
+            base[key] = _deep_merge(dict(current), value, list_merge, uniques)
+        elif list_merge != 'replace' and _is_list(current) and _is_list(value):
+            if list_merge == 'append_unique':
+                # keyed by id of the merged list, so a later dict extends it without rescanning it
+                unique = uniques.get(id(current))
+                if unique is None or unique.values is not current:
+                    unique = _UniqueList(current)
+                    uniques[id(unique.values)] = unique
+                unique.extend(value)
+                base[key] = unique.values
+            else:
+                base[key] = list(current) + list(value)
+        else:
+            base[key] = value
+    return base
+
+
+def merge_dicts(dicts, list_merge='replace'):
+    ''' recursively merge a list of dicts left to right in one pass
+
+    list_merge is replace (like combine), append or append_unique for lists found under the same key.
+    '''
+    if list_merge not in ('replace', 'append', 'append_unique'):
+        raise AnsibleFilterError("merge_dicts: list_merge must be 'replace', 'append' or 'append_unique'")
+    merged = {}
+    uniques = {}
+    for item in dicts:
+        if not isinstance(item, Mapping):
+            raise AnsibleFilterError('merge_dicts expects a list of dicts, got %r' % (item,))
+        _deep_merge(merged, item, list_merge, uniques)
+    return merged
+
+
+_PREDICATES = {
+    'eq': operator.eq, '==': operator.eq,
+    'ne': operator.ne, '!=': operator.ne,
+    'lt': operator.lt, '<': operator.lt,
+    'le': operator.le, '<=': operator.le,
+    'gt': operator.gt, '>': operator.gt,
+    'ge': operator.ge, '>=': operator.ge,
+    'in': lambda value, arg: value in arg,
+    'contains': lambda value, arg: arg in value,
+    'match': lambda value, arg: re.match(arg, value) is not None,
+    'search': lambda value, arg: re.search(arg, value) is not None,
+    'truthy': lambda value, arg: bool(value),
+    'defined': lambda value, arg: value is not _MISSING,
+}
+
+
+def _matches(items, key, test, arg):
+    try:
+        predicate = _PREDICATES[test]
+    except KeyError:
+        raise AnsibleFilterError('unknown predicate %r, expected one of %s' % (test, ', '.join(sorted(_PREDICATES))))
+    for item in items:
+        value = _lookup(item, key, _MISSING)
+        if value is _MISSING and test != 'defined':
+            yield item, False
+            continue
+        try:
+            yield item, predicate(value, arg)
+        except TypeError:
+            yield item, False
+
+
+def select_by(items, key, test='truthy', arg=None):
+    ''' items whose key passes the test, e.g. select_by('port', 'gt', 1024); missing keys never match '''
+    return [item for item, matched in _matches(items, key, test, arg) if matched]
+
+
+def reject_by(items, key, test='truthy', arg=None):
+    ''' items whose key does not pass the test, including items without the key '''
+    return [item for item, matched in _matches(items, key, test, arg) if not matched]
+
+
+def flatten_items(data, levels=None):
+    ''' flatten nested lists iteratively, levels deep or completely; unlike flatten, keeps None values '''
+    result = []
+    stack = [(iter(data), 0)]
+    while stack:
+        try:
+            value = next(stack[-1][0])
+        except StopIteration:
+            stack.pop()
+            continue
+        depth = stack[-1][1]
+        if _is_list(value) and (levels is None or depth < int(levels)):
+            stack.append((iter(value), depth + 1))
+        else:
+            result.append(value)
+    return result
+
+
+def zip_lists(first, *others, **kwargs):
+    ''' [[a0, b0, ...], [a1, b1, ...]]; longest=True pads with fillvalue instead of stopping at the shortest '''
+    if kwargs.get('longest'):
+        return [list(t) for t in zip_longest(first, *others, fillvalue=kwargs.get('fillvalue'))]
+    return [list(t) for t in zip(first, *others)]
+
+
+def zip_dict(keys, values):
+    ''' {keys[i]: values[i]} '''
+    return dict(zip(keys, values))
+
+
+class FilterModule(object):
+    ''' bulk collection transforms done in one Python pass instead of Jinja or loop + set_fact '''
+
+    def filters(self):
+        return {
+            'group_by_key': group_by_key,
+            'index_by_key': index_by_key,
+            'merge_dicts': merge_dicts,
+            'select_by': select_by,
+            'reject_by': reject_by,
+            'flatten_items': flatten_items,
+            'zip_lists': zip_lists,
+            'zip_dict': zip_dict,
+        }
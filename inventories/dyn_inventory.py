@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 from argparse import ArgumentParser
-from pprint import pprint
+import json
 
 inventory = {'group_one': {'hosts': ['group_one_host_0{}'.format(i) for i in range(1, 6)]
                                     + ['group_one_and_two_host_0{}'.format(i) for i in range(1, 6)]
@@ -35,8 +35,10 @@ def parse_args():
 
 def load_inventory():
     args = parse_args()
-    if args.list_instances:
-        pprint(inventory)
+    if args.requested_host:
+        print(json.dumps({}))
+    elif args.list_instances:
+        print(json.dumps(inventory, indent=4))
 
 
 if __name__ == '__main__':
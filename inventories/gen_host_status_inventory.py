@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""Scalable version of for_gen_host_status.ini for gen_host_status.yml.
+
+Host names follow the same ``<n>_<outcome>`` pattern, and gen_host_status.yml
+derives each host's outcome from that suffix. Outcomes are assigned in
+proportion to a weighted mix. Parameters come from the environment so the
+script also works as an inventory source:
+
+    GEN_HOST_STATUS_HOSTS  number of hosts (default: 6)
+    GEN_HOST_STATUS_MIX    comma separated outcome=weight pairs
+                           (default: ok=1,skipped=1,changed=1,failed=1,ignored=1,rescued=1)
+
+Valid outcomes are ok, skipped, changed, failed, ignored, rescued and
+unreachable. Unreachable hosts keep the default connection so their ping
+really fails; every other host uses the local connection. Pass ``--ini`` to
+print a static INI inventory instead of JSON.
+
+    GEN_HOST_STATUS_HOSTS=20000 GEN_HOST_STATUS_MIX=ok=70,changed=20,failed=5,skipped=5 \\
+        ansible-playbook -i gen_host_status_inventory.py ../gen_host_status.yml
+"""
+from argparse import ArgumentParser
+import json
+import os
+import sys
+
+OUTCOMES = ('ok', 'skipped', 'changed', 'failed', 'ignored', 'rescued', 'unreachable')
+DEFAULT_MIX = 'ok=1,skipped=1,changed=1,failed=1,ignored=1,rescued=1'
+
+
+def parse_mix(value):
+    mix = []
+    for pair in value.split(','):
+        if not pair.strip():
+            continue
+        outcome, _, weight = pair.partition('=')
+        outcome = outcome.strip()
+        if outcome not in OUTCOMES:
+            raise ValueError('unknown outcome {0!r}, expected one of {1}'.format(outcome, ', '.join(OUTCOMES)))
+        mix.append((outcome, int(weight or 1)))
+    if not mix or sum(weight for _, weight in mix) <= 0:
+        raise ValueError('the outcome mix needs at least one positive weight')
+    return mix
+
+
+class HostStatusInventory(object):
+
+    def __init__(self, hosts, mix):
+        self.hosts = hosts
+        # one slot per unit of weight, interleaved so every prefix of hosts has roughly the same mix
+        slots = sorted(((i + 0.5) / weight, outcome) for outcome, weight in mix for i in range(weight))
+        self.slots = [outcome for _, outcome in slots]
+
+    def host_name(self, index):
+        return '{0}_{1}'.format(index + 1, self.slots[index % len(self.slots)])
+
+    def host_names(self):
+        for index in range(self.hosts):
+            yield self.host_name(index)
+
+    def write_list(self, out):
+        dumps = json.dumps
+        out.write('{"all": {"vars": {"ansible_connection": "local"}}, "ungrouped": {"hosts": [')
+        out.write(', '.join(dumps(name) for name in self.host_names()))
+        out.write(']}, "_meta": {"hostvars": {')
+        first = True
+        for name in self.host_names():
+            if name.endswith('_unreachable'):
+                out.write('{0}{1}: {{"ansible_connection": "ssh"}}'.format('' if first else ', ', dumps(name)))
+                first = False
+        out.write('}}}\n')
+
+    def write_ini(self, out):
+        for name in self.host_names():
+            out.write(name + (' ansible_connection=ssh\n' if name.endswith('_unreachable') else '\n'))
+        out.write('\n[all:vars]\nansible_connection=local\n')
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
+                        help='List instances (default: True)')
+    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    parser.add_argument('--hosts', type=int, default=int(os.environ.get('GEN_HOST_STATUS_HOSTS', 6)),
+                        help='Number of hosts (env: GEN_HOST_STATUS_HOSTS)')
+    parser.add_argument('--mix', default=os.environ.get('GEN_HOST_STATUS_MIX', DEFAULT_MIX),
+                        help='Comma separated outcome=weight pairs (env: GEN_HOST_STATUS_MIX)')
+    parser.add_argument('--ini', action='store_true', help='Print a static INI inventory instead of JSON')
+    return parser.parse_args()
+
+
+def load_inventory():
+    args = parse_args()
+    inventory = HostStatusInventory(args.hosts, parse_mix(args.mix))
+    if args.requested_host:
+        print(json.dumps({}))
+    elif args.ini:
+        inventory.write_ini(sys.stdout)
+    elif args.list_instances:
+        inventory.write_list(sys.stdout)
+
+
+if __name__ == '__main__':
+    load_inventory()
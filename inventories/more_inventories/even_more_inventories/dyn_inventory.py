@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 from argparse import ArgumentParser
-from pprint import pprint
+import json
 
 inventory = {'group_seven': {'hosts': ['group_seven_host_0{}'.format(i) for i in range(1, 6)]
                                     + ['group_seven_and_eight_host_0{}'.format(i) for i in range(1, 6)]
@@ -32,8 +32,10 @@ def parse_args():
 
 def load_inventory():
     args = parse_args()
-    if args.list_instances:
-        pprint(inventory)
+    if args.requested_host:
+        print(json.dumps({}))
+    elif args.list_instances:
+        print(json.dumps(inventory, indent=4))
 
 
 if __name__ == '__main__':
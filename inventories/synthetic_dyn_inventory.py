@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+"""Synthetic dynamic inventory for exercising inventory sync at scale.
+
+Every host, group and variable is derived arithmetically from the host index,
+so the script never holds the whole inventory in memory: ``--list`` streams
+JSON to stdout group by group, and ``--host`` computes a single host's vars
+in constant time.
+
+Ansible and AWX invoke inventory scripts with only ``--list``/``--host``, so
+each parameter can also be supplied through the environment (the command line
+wins when both are given):
+
+    SYNTH_INV_HOSTS          number of hosts (default: 1000)
+    SYNTH_INV_GROUPS         number of groups hosts are spread across (default: 10)
+    SYNTH_INV_OVERLAP        fraction of hosts that also belong to the next group (default: 0.1)
+    SYNTH_INV_VARS_PER_HOST  number of generated vars per host (default: 5)
+    SYNTH_INV_META           set to 0/false to omit _meta and force per-host --host calls (default: 1)
+    SYNTH_INV_INDEX          path of an on-disk hostvars index (default: unset)
+    SYNTH_INV_TIMING         set to 1 to report lookup time on stderr (default: 0)
+
+When SYNTH_INV_INDEX is set, ``--list`` also writes every host's vars into one
+JSON blob preceded by a fixed-width offset table, and ``--host`` answers from
+that file through mmap instead of generating the vars again. This models a
+script that precomputes its data once per sync rather than once per host.
+
+Example:
+
+    SYNTH_INV_HOSTS=100000 ansible-inventory -i synthetic_dyn_inventory.py --list > /dev/null
+"""
+from argparse import ArgumentParser
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+HOST_PREFIX = 'synthetic_host_'
+GROUP_PREFIX = 'synthetic_group_'
+# Knuth's multiplicative hash, used to pick overlapping hosts deterministically
+_HASH_MULTIPLIER = 2654435761
+_HASH_BUCKETS = 10000
+# Number of host names buffered before each write to stdout
+_CHUNK_SIZE = 1000
+
+# Index layout: magic, host count and signature length, the JSON signature of
+# the parameters that produced it, then one (offset, length) entry per host
+# and finally the concatenated hostvars JSON documents.
+INDEX_MAGIC = b'SYNIDX01'
+_INDEX_HEADER = struct.Struct('<8sQQ')
+_INDEX_ENTRY = struct.Struct('<QI')
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ('0', 'false', 'no', 'off', '')
+
+
+class SyntheticInventory(object):
+
+    def __init__(self, hosts, groups, overlap, vars_per_host, meta=True):
+        if hosts < 0 or groups < 1 or vars_per_host < 0:
+            raise ValueError('hosts and vars_per_host must be >= 0 and groups must be >= 1')
+        if not 0.0 <= overlap <= 1.0:
+            raise ValueError('overlap must be between 0.0 and 1.0')
+        self.hosts = hosts
+        self.groups = groups
+        self.overlap = overlap
+        self.vars_per_host = vars_per_host
+        self.meta = meta
+        self._width = len(str(max(hosts - 1, 0)))
+        self._overlap_threshold = int(round(overlap * _HASH_BUCKETS))
+
+    def host_name(self, index):
+        return '{0}{1:0{2}d}'.format(HOST_PREFIX, index, self._width)
+
+    def group_name(self, index):
+        return '{0}{1}'.format(GROUP_PREFIX, index)
+
+    def host_index(self, name):
+        """Return the index encoded in a host name, or None if it is not one of ours."""
+        if not name.startswith(HOST_PREFIX):
+            return None
+        digits = name[len(HOST_PREFIX):]
+        if len(digits) != self._width or not digits.isdigit():
+            return None
+        index = int(digits)
+        if index >= self.hosts:
+            return None
+        return index
+
+    def overlaps(self, index):
+        """Whether a host is also a member of the group after its primary one."""
+        if self.groups < 2:
+            return False
+        return (index * _HASH_MULTIPLIER) % _HASH_BUCKETS < self._overlap_threshold
+
+    def host_groups(self, index):
+        primary = index % self.groups
+        if self.overlaps(index):
+            return [primary, (primary + 1) % self.groups]
+        return [primary]
+
+    def group_members(self, group):
+        """Yield host indexes in a group without scanning the whole host range."""
+        for index in range(group, self.hosts, self.groups):
+            yield index
+        if self.groups > 1:
+            for index in range((group - 1) % self.groups, self.hosts, self.groups):
+                if self.overlaps(index):
+                    yield index
+
+    def host_vars(self, index):
+        host_vars = {'synthetic_index': index,
+                     'synthetic_groups': [self.group_name(g) for g in self.host_groups(index)]}
+        for i in range(self.vars_per_host):
+            host_vars['synthetic_var_{0}'.format(i)] = 'value_{0}_{1}'.format(index, i)
+        return host_vars
+
+    def group_vars(self, group):
+        return {'is_in_{0}'.format(self.group_name(group)): True}
+
+    def write_list(self, out):
+        dumps = json.dumps
+        out.write('{"all": {"vars": {"ansible_connection": "local", "synthetic_inventory": true}}')
+        for group in range(self.groups):
+            out.write(', {0}: {{"vars": {1}, "hosts": ['.format(dumps(self.group_name(group)),
+                                                              dumps(self.group_vars(group))))
+            chunk = []
+            first = True
+            for index in self.group_members(group):
+                chunk.append(dumps(self.host_name(index)))
+                if len(chunk) >= _CHUNK_SIZE:
+                    out.write(('' if first else ', ') + ', '.join(chunk))
+                    first = False
+                    chunk = []
+            if chunk:
+                out.write(('' if first else ', ') + ', '.join(chunk))
+            out.write(']}')
+        if self.meta:
+            out.write(', "_meta": {"hostvars": {')
+            for index in range(self.hosts):
+                out.write('{0}{1}: {2}'.format(', ' if index else '',
+                                               dumps(self.host_name(index)),
+                                               dumps(self.host_vars(index))))
+            out.write('}}')
+        out.write('}\n')
+
+    def write_host(self, out, name):
+        index = self.host_index(name)
+        out.write(json.dumps(self.host_vars(index) if index is not None else {}))
+        out.write('\n')
+
+    def signature(self):
+        return json.dumps({'hosts': self.hosts, 'groups': self.groups, 'overlap': self.overlap,
+                           'vars_per_host': self.vars_per_host}, sort_keys=True).encode('utf-8')
+
+    def write_index(self, path):
+        """Write all hostvars into an offset-indexed file, replacing it atomically."""
+        signature = self.signature()
+        table_start = _INDEX_HEADER.size + len(signature)
+        blob_start = table_start + _INDEX_ENTRY.size * self.hosts
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(INDEX_MAGIC, self.hosts, len(signature)))
+            f.write(signature)
+            f.seek(blob_start)
+            entries = []
+            offset = 0
+            for index in range(self.hosts):
+                data = json.dumps(self.host_vars(index)).encode('utf-8')
+                f.write(data)
+                entries.append(_INDEX_ENTRY.pack(offset, len(data)))
+                offset += len(data)
+            f.seek(table_start)
+            f.write(b''.join(entries))
+        os.rename(tmp_path, path)
+
+    def write_host_from_index(self, out, name, path):
+        """Answer --host from an index written by write_index.
+
+        Returns False when the index is missing or was built with different
+        parameters, in which case the caller should generate the vars instead.
+        """
+        index = self.host_index(name)
+        if index is None:
+            out.write('{}\n')
+            return True
+        try:
+            f = open(path, 'rb')
+        except (IOError, OSError):
+            return False
+        with f:
+            if os.fstat(f.fileno()).st_size < _INDEX_HEADER.size:
+                return False
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                magic, count, signature_len = _INDEX_HEADER.unpack_from(mm, 0)
+                signature_end = _INDEX_HEADER.size + signature_len
+                if magic != INDEX_MAGIC or count != self.hosts or \
+                        mm[_INDEX_HEADER.size:signature_end] != self.signature():
+                    return False
+                blob_start = signature_end + _INDEX_ENTRY.size * count
+                offset, length = _INDEX_ENTRY.unpack_from(mm, signature_end + _INDEX_ENTRY.size * index)
+                out.write(mm[blob_start + offset:blob_start + offset + length].decode('utf-8'))
+                out.write('\n')
+            finally:
+                mm.close()
+        return True
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('--list', dest='list_instances', action='store_true', default=True,
+                        help='List instances (default: True)')
+    parser.add_argument('--host', dest='requested_host', help='Get all the variables about a specific instance')
+    parser.add_argument('--hosts', type=int, default=int(os.environ.get('SYNTH_INV_HOSTS', 1000)),
+                        help='Number of hosts to generate (env: SYNTH_INV_HOSTS)')
+    parser.add_argument('--groups', type=int, default=int(os.environ.get('SYNTH_INV_GROUPS', 10)),
+                        help='Number of groups hosts are spread across (env: SYNTH_INV_GROUPS)')
+    parser.add_argument('--overlap', type=float, default=float(os.environ.get('SYNTH_INV_OVERLAP', 0.1)),
+                        help='Fraction of hosts also placed in a second group (env: SYNTH_INV_OVERLAP)')
+    parser.add_argument('--vars-per-host', type=int, default=int(os.environ.get('SYNTH_INV_VARS_PER_HOST', 5)),
+                        help='Number of generated vars per host (env: SYNTH_INV_VARS_PER_HOST)')
+    parser.add_argument('--meta', dest='meta', action='store_true', default=env_bool('SYNTH_INV_META', True),
+                        help='Include _meta.hostvars in --list output (env: SYNTH_INV_META)')
+    parser.add_argument('--no-meta', dest='meta', action='store_false',
+                        help='Omit _meta so Ansible calls --host once per host')
+    parser.add_argument('--index', default=os.environ.get('SYNTH_INV_INDEX'),
+                        help='Precomputed hostvars index written by --list and read by --host (env: SYNTH_INV_INDEX)')
+    parser.add_argument('--timing', action='store_true', default=env_bool('SYNTH_INV_TIMING', False),
+                        help='Report lookup time in seconds on stderr (env: SYNTH_INV_TIMING)')
+    return parser.parse_args()
+
+
+def load_inventory():
+    args = parse_args()
+    inventory = SyntheticInventory(args.hosts, args.groups, args.overlap, args.vars_per_host, meta=args.meta)
+    start = time.time()
+    if args.requested_host:
+        if not (args.index and inventory.write_host_from_index(sys.stdout, args.requested_host, args.index)):
+            inventory.write_host(sys.stdout, args.requested_host)
+    else:
+        inventory.write_list(sys.stdout)
+        if args.index:
+            inventory.write_index(args.index)
+    if args.timing:
+        sys.stderr.write('synthetic_inventory_lookup_seconds={0:.6f}\n'.format(time.time() - start))
+
+
+if __name__ == '__main__':
+    load_inventory()
@@ -0,0 +1,163 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+    inventory: synthetic
+    version_added: "2.8"
+    short_description: Generates a large, configurable host and group topology
+    description:
+        - Builds a tree of nested groups C(group_depth) levels deep with C(group_fanout) children per group,
+          spreads C(hosts) hosts round-robin across the leaf groups and gives every host C(vars_per_host) vars.
+        - The generated topology is stored in the inventory cache when C(cache) is enabled, so repeated
+          syncs skip generation and only pay for adding hosts, groups and vars to the inventory.
+        - Set C(report_timing) to print how long generation, cache access and population took.
+    extends_documentation_fragment:
+        - inventory_cache
+    options:
+        plugin:
+            description: token that ensures this is a source file for the 'synthetic' plugin.
+            required: True
+            choices: ['synthetic']
+        hosts:
+            description: Number of hosts to generate.
+            type: int
+            default: 1000
+        group_depth:
+            description: Number of levels of nested groups below C(all).
+            type: int
+            default: 2
+        group_fanout:
+            description: Number of child groups under each group.
+            type: int
+            default: 4
+        vars_per_host:
+            description: Number of generated variables per host.
+            type: int
+            default: 5
+        vars_per_group:
+            description: Number of generated variables per group.
+            type: int
+            default: 1
+        report_timing:
+            description: Print generation, cache and population times.
+            type: bool
+            default: False
+'''
+
+EXAMPLES = r'''
+    # synthetic.yaml
+    plugin: synthetic
+    hosts: 100000
+    group_depth: 3
+    group_fanout: 5
+    cache: true
+    cache_plugin: jsonfile
+    cache_connection: /tmp/synthetic_inventory_cache
+'''
+
+import time
+
+from ansible.errors import AnsibleParserError
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable
+from ansible.utils.display import Display
+
+display = Display()
+
+
+class InventoryModule(BaseInventoryPlugin, Cacheable):
+
+    NAME = 'synthetic'
+
+    def verify_file(self, path):
+        ''' only accept files named synthetic.yml or synthetic.yaml '''
+        return super(InventoryModule, self).verify_file(path) and \
+            path.endswith(('synthetic.yml', 'synthetic.yaml'))
+
+    def _generate(self):
+        ''' build the topology as plain data so it can be stored in the cache '''
+        hosts = self.get_option('hosts')
+        depth = self.get_option('group_depth')
+        fanout = self.get_option('group_fanout')
+        vars_per_host = self.get_option('vars_per_host')
+        vars_per_group = self.get_option('vars_per_group')
+        if hosts < 0 or depth < 0 or fanout < 1 or vars_per_host < 0 or vars_per_group < 0:
+            raise AnsibleParserError('synthetic inventory options must be non-negative and group_fanout >= 1')
+
+        groups = {}
+        level = ['synthetic']
+        groups['synthetic'] = {'children': [], 'vars': self._group_vars('synthetic', vars_per_group)}
+        for _ in range(depth):
+            next_level = []
+            for parent in level:
+                for i in range(fanout):
+                    name = '{0}_{1}'.format(parent, i)
+                    groups[name] = {'children': [], 'vars': self._group_vars(name, vars_per_group)}
+                    groups[parent]['children'].append(name)
+                    next_level.append(name)
+            level = next_level
+
+        width = len(str(max(hosts - 1, 0)))
+        host_list = []
+        for index in range(hosts):
+            host_vars = {'synthetic_index': index}
+            for i in range(vars_per_host):
+                host_vars['synthetic_var_{0}'.format(i)] = 'value_{0}_{1}'.format(index, i)
+            host_list.append(['synthetic_host_{0:0{1}d}'.format(index, width), level[index % len(level)], host_vars])
+        return {'groups': groups, 'hosts': host_list}
+
+    @staticmethod
+    def _group_vars(name, count):
+        return dict(('{0}_var_{1}'.format(name, i), i) for i in range(count))
+
+    def _populate(self, topology):
+        for name in topology['groups']:
+            self.inventory.add_group(name)
+        for name, group in topology['groups'].items():
+            for child in group['children']:
+                self.inventory.add_child(name, child)
+            for key, value in group['vars'].items():
+                self.inventory.set_variable(name, key, value)
+        for name, group, host_vars in topology['hosts']:
+            self.inventory.add_host(name, group=group)
+            for key, value in host_vars.items():
+                self.inventory.set_variable(name, key, value)
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        # cache is True when the caller wants cached data, False for a forced refresh
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        timings = {}
+        topology = None
+        if attempt_to_read_cache:
+            start = time.time()
+            try:
+                topology = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+            timings['cache_read'] = time.time() - start
+
+        if topology is None:
+            start = time.time()
+            topology = self._generate()
+            timings['generate'] = time.time() - start
+
+        if cache_needs_update:
+            start = time.time()
+            self._cache[cache_key] = topology
+            timings['cache_write'] = time.time() - start
+
+        start = time.time()
+        self._populate(topology)
+        timings['populate'] = time.time() - start
+
+        if self.get_option('report_timing'):
+            # stderr keeps ansible-inventory --list output parseable
+            display.display('synthetic inventory: {0} hosts, {1} groups, {2}'.format(
+                len(topology['hosts']), len(topology['groups']),
+                ', '.join('{0}={1:.3f}s'.format(k, v) for k, v in sorted(timings.items()))), stderr=True)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import time
+
+from ansible.module_utils.basic import * # noqa
+
+DOCUMENTATION = '''
+---
+module: async_wait_all
+short_description: Wait for many async jobs in a single task.
+description:
+    - Polls the status files of every given async job in one loop on the remote host, reading all of
+      them each cycle, until every job has finished or C(timeout) is reached.
+    - Replaces one C(async_status) task with C(until)/C(retries) per job, where every retry is a full
+      task round trip.
+    - The companion action plugin resolves the async directory and accepts registered async results
+      as well as bare job ids.
+version_added: "2.8"
+options:
+    jids:
+        description:
+            - Job ids to wait for, or registered results of tasks run with C(poll: 0)
+              (for example C(fired.results) from a loop).
+        type: list
+        required: true
+    timeout:
+        description: Seconds to wait for all jobs before failing.
+        type: int
+        default: 300
+    poll:
+        description: Seconds to sleep between reads of the job status files.
+        type: float
+        default: 1
+    cleanup:
+        description: Remove the status files of finished jobs.
+        type: bool
+        default: false
+    fail_on_job_failure:
+        description: Fail the task if any of the jobs failed.
+        type: bool
+        default: true
+requirements: []
+author: Ansible Tower QE
+'''
+
+EXAMPLES = '''
+- shell: "sleep {{ item }}"
+  async: 60
+  poll: 0
+  loop: [1, 2, 3]
+  register: fired
+
+- async_wait_all:
+    jids: "{{ fired.results }}"
+    timeout: 120
+'''
+
+RETURN = '''
+jobs:
+    description: Final status of every job, keyed by job id, as async_status would return it.
+    type: dict
+finished:
+    description: Number of jobs that finished.
+    type: int
+failed_jobs:
+    description: Ids of jobs that finished with a failure.
+    type: list
+cycles:
+    description: Number of times the status files were read.
+    type: int
+'''
+
+
+def read_status(module, path, jid):
+    ''' status of one job in the same shape async_status returns, or None while it is still running '''
+    try:
+        with open(path) as f:
+            contents = f.read()
+    except IOError:
+        module.fail_json(msg="could not find job", ansible_job_id=jid, started=1, finished=1)
+    try:
+        data = json.loads(contents)
+    except ValueError:
+        # the job is still writing its result
+        return None
+    if 'started' in data:
+        return None
+    data['finished'] = 1
+    data['ansible_job_id'] = jid
+    return data
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec = dict(
+            jids=dict(type='list', required=True),
+            timeout=dict(type='int', default=300),
+            poll=dict(type='float', default=1),
+            cleanup=dict(type='bool', default=False),
+            fail_on_job_failure=dict(type='bool', default=True),
+            _async_dir=dict(type='path', required=True)))
+
+    async_dir = module.params['_async_dir']
+    pending = dict((str(jid), os.path.join(async_dir, str(jid))) for jid in module.params['jids'])
+    jobs = {}
+    cycles = 0
+    deadline = time.time() + module.params['timeout']
+
+    while True:
+        cycles += 1
+        for jid, path in list(pending.items()):
+            status = read_status(module, path, jid)
+            if status is not None:
+                jobs[jid] = status
+                del pending[jid]
+                if module.params['cleanup']:
+                    os.unlink(path)
+        if not pending or time.time() >= deadline:
+            break
+        time.sleep(module.params['poll'])
+
+    failed_jobs = sorted(jid for jid, status in jobs.items() if status.get('failed') or status.get('rc', 0) != 0)
+    results = dict(changed=any(status.get('changed') for status in jobs.values()), jobs=jobs, finished=len(jobs),
+                   pending_jobs=sorted(pending), failed_jobs=failed_jobs, cycles=cycles)
+    if pending:
+        module.fail_json(msg="%d of %d async jobs did not finish within %d seconds"
+                         % (len(pending), len(module.params['jids']), module.params['timeout']), **results)
+    if failed_jobs and module.params['fail_on_job_failure']:
+        module.fail_json(msg="%d async jobs failed" % len(failed_jobs), **results)
+    module.exit_json(**results)
+
+main()
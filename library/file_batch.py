@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import errno
+import os
+import shutil
+
+from ansible.module_utils.basic import * # noqa
+
+DOCUMENTATION = '''
+---
+module: file_batch
+short_description: Apply one file state to a whole list of paths in a single invocation.
+description:
+    - Batched counterpart to looping the C(file) module over a list of paths; every path is handled
+      inside one module run, so the per-item module dispatch cost is paid once.
+    - Missing parent directories are created for C(directory) and C(touch).
+version_added: "2.8"
+options:
+    paths:
+        description: Paths to operate on.
+        type: list
+        required: true
+    state:
+        description: Desired state of every path.
+        choices: [directory, touch, absent]
+        default: directory
+    mode:
+        description: Permissions applied to each created or existing path, as with the C(file) module.
+        type: raw
+requirements: []
+author: Ansible Tower QE
+'''
+
+EXAMPLES = '''
+- file_batch:
+    paths:
+      - /opt/test/6555b322075c3a2933b422822051c864
+      - /opt/test/c2b5e864be8064373611227c8a6c555d
+    state: directory
+    mode: 0o0700
+'''
+
+RETURN = '''
+count:
+    description: Number of paths processed.
+    type: int
+changed_count:
+    description: Number of paths that were changed.
+    type: int
+failed_paths:
+    description: Paths that could not be brought to the requested state, with the error.
+    type: dict
+'''
+
+
+def ensure_directory(path):
+    if os.path.isdir(path):
+        return False
+    os.makedirs(path)
+    return True
+
+
+def ensure_touch(path):
+    parent = os.path.dirname(path)
+    if parent and not os.path.isdir(parent):
+        os.makedirs(parent)
+    existed = os.path.exists(path)
+    with open(path, 'a'):
+        os.utime(path, None)
+    return not existed
+
+
+def ensure_absent(path):
+    try:
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            return False
+        raise
+    return True
+
+
+HANDLERS = dict(directory=ensure_directory, touch=ensure_touch, absent=ensure_absent)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec = dict(
+            paths=dict(type='list', required=True),
+            state=dict(default='directory', choices=list(HANDLERS)),
+            mode=dict(type='raw')),
+        supports_check_mode=True)
+
+    state = module.params['state']
+    mode = module.params['mode']
+    handler = HANDLERS[state]
+    changed_count = 0
+    failed_paths = {}
+
+    for path in module.params['paths']:
+        path = os.path.expanduser(path)
+        try:
+            if module.check_mode:
+                changed = os.path.exists(path) == (state == 'absent')
+            else:
+                changed = handler(path)
+                if mode is not None and state != 'absent':
+                    changed = module.set_mode_if_different(path, mode, changed)
+        except (IOError, OSError) as e:
+            failed_paths[path] = str(e)
+            continue
+        if changed:
+            changed_count += 1
+
+    results = dict(changed=changed_count > 0, count=len(module.params['paths']), changed_count=changed_count,
+                   failed_paths=failed_paths)
+    if failed_paths:
+        module.fail_json(msg="%d of %d paths failed" % (len(failed_paths), results['count']), **results)
+    module.exit_json(**results)
+
+main()
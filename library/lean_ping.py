@@ -0,0 +1,56 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Not /usr/bin/env python: without AnsiballZ the shebang is sent as is, and only
+# a python shebang is rewritten to ansible_python_interpreter.
+
+import json
+import sys
+
+DOCUMENTATION = '''
+---
+module: lean_ping
+short_description: ping without AnsiballZ or module_utils.
+description:
+    - Behaves like the C(ping) module, but is a C(jsonargs) style module. Its arguments are substituted
+      into the source as a JSON string instead of being passed through the AnsiballZ wrapper, so it is
+      sent as a few hundred bytes of plain Python and imports nothing beyond C(json) and C(sys).
+    - Used by C(benchmarks/module_dispatch.py) as the minimal-import counterpart of C(ping). It still
+      supports pipelining, unlike C(WANT_JSON) modules.
+    - There is no argument validation, check mode handling or no_log filtering; those come with
+      C(AnsibleModule).
+version_added: "2.8"
+options:
+    data:
+        description: Data to return in C(ping). C(crash) raises an exception, like C(ping).
+        default: pong
+requirements: []
+author: Ansible Tower QE
+'''
+
+EXAMPLES = '''
+- lean_ping:
+'''
+
+RETURN = '''
+ping:
+    description: The value of C(data).
+    type: str
+'''
+
+# Replaced with the task's arguments as JSON when the module is sent. json.dumps
+# escapes quotes and backslashes, so only a value containing three single quotes
+# in a row could end this string early.
+JSON_ARGS = r''' <<INCLUDE_ANSIBLE_MODULE_JSON_ARGS>> '''
+
+
+def main():
+    args = json.loads(JSON_ARGS)
+    data = args.get('data', 'pong')
+    if data == 'crash':
+        raise Exception('boom')
+    json.dump({'changed': False, 'ping': data}, sys.stdout)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import base64
+import hashlib
+import os
+
+from ansible.module_utils.basic import * # noqa
+
+DOCUMENTATION = '''
+---
+module: safe_cat
+short_description: Read a file without returning an unbounded amount of it.
+description:
+    - Replacement for registering the output of C(cat) on files of unknown size. The result never holds
+      more than C(chunk_size) bytes (C(mode=chunk)) or two C(window_size) windows (C(mode=window)) of
+      the file, so a multi-MB file does not become a multi-MB result on the controller.
+    - C(mode=chunk) returns the bytes from C(offset), and the offset to pass to read the next chunk.
+    - C(mode=digest) returns only the size and a checksum, read in fixed size blocks.
+    - C(mode=window) returns the first C(head) and last C(tail) lines, each capped at C(window_size) bytes.
+version_added: "2.8"
+options:
+    path:
+        description: File to read.
+        required: true
+    mode:
+        description: What to return, see the description.
+        choices: [chunk, digest, window]
+        default: chunk
+    offset:
+        description: Byte offset of the chunk to return with C(mode=chunk).
+        type: int
+        default: 0
+    chunk_size:
+        description: Maximum bytes returned with C(mode=chunk).
+        type: int
+        default: 65536
+    head:
+        description: Lines from the start of the file returned with C(mode=window).
+        type: int
+        default: 10
+    tail:
+        description: Lines from the end of the file returned with C(mode=window).
+        type: int
+        default: 10
+    window_size:
+        description: Maximum bytes of each of the head and tail windows.
+        type: int
+        default: 65536
+    checksum_algorithm:
+        description: Digest used with C(mode=digest).
+        choices: [md5, sha1, sha256, sha512]
+        default: sha256
+    encoding:
+        description:
+            - How content is returned. C(text) decodes it as UTF-8, replacing undecodable bytes
+              (including a multi-byte character split by a chunk boundary); C(base64) returns it exactly.
+        choices: [text, base64]
+        default: text
+requirements: []
+author: Ansible Tower QE
+'''
+
+EXAMPLES = '''
+- safe_cat:
+    path: /var/log/messages
+    mode: window
+    tail: 50
+  register: log_tail
+
+- safe_cat:
+    path: /srv/dump.sql
+    mode: digest
+  register: dump
+
+- safe_cat:
+    path: /srv/dump.sql
+    offset: "{{ previous.next_offset }}"
+    chunk_size: 1048576
+  register: next_chunk
+'''
+
+RETURN = '''
+size:
+    description: Size of the file in bytes.
+    type: int
+content:
+    description: The chunk read with C(mode=chunk).
+    type: str
+offset:
+    description: Offset the chunk starts at.
+    type: int
+next_offset:
+    description: Offset of the byte after the chunk.
+    type: int
+eof:
+    description: Whether the chunk reaches the end of the file.
+    type: bool
+checksum:
+    description: Checksum of the file with C(mode=digest).
+    type: str
+head:
+    description: First lines of the file with C(mode=window).
+    type: str
+tail:
+    description: Last lines of the file with C(mode=window), empty when the head already covers the whole file.
+    type: str
+truncated:
+    description: Whether part of the file is in neither the head nor the tail window.
+    type: bool
+'''
+
+BLOCK_SIZE = 1 << 20
+
+
+def encode(data, encoding):
+    if encoding == 'base64':
+        return base64.b64encode(data).decode('ascii')
+    return data.decode('utf-8', 'replace')
+
+
+def read_chunk(f, size, offset, chunk_size):
+    offset = min(offset, size)
+    f.seek(offset)
+    data = f.read(chunk_size)
+    next_offset = offset + len(data)
+    return data, {'offset': offset, 'next_offset': next_offset, 'eof': next_offset >= size}
+
+
+def file_checksum(f, algorithm):
+    digest = hashlib.new(algorithm)
+    block = f.read(BLOCK_SIZE)
+    while block:
+        digest.update(block)
+        block = f.read(BLOCK_SIZE)
+    return digest.hexdigest()
+
+
+def read_head(f, lines, window_size):
+    ''' the first lines, up to window_size bytes, and the offset just after them '''
+    if lines <= 0:
+        return b'', 0
+    f.seek(0)
+    data = f.read(window_size)
+    end = 0
+    for _ in range(lines):
+        newline = data.find(b'\n', end)
+        if newline == -1:
+            end = len(data)
+            break
+        end = newline + 1
+    return data[:end], end
+
+
+def read_tail(f, size, lines, window_size, start):
+    ''' the last lines, up to window_size bytes, never reaching back before start, and their offset '''
+    if lines <= 0 or size <= start:
+        return b'', size
+    begin = max(start, size - window_size)
+    f.seek(begin)
+    data = f.read(size - begin)
+    # a trailing newline ends the last line rather than starting an empty one
+    pos = len(data) - 1 if data.endswith(b'\n') else len(data)
+    for _ in range(lines):
+        newline = data.rfind(b'\n', 0, pos)
+        if newline == -1:
+            # fewer lines than asked for in the window; like the head, keep what is there
+            pos = -1
+            break
+        pos = newline
+    return data[pos + 1:], begin + pos + 1
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            path=dict(type='path', required=True),
+            mode=dict(type='str', default='chunk', choices=['chunk', 'digest', 'window']),
+            offset=dict(type='int', default=0),
+            chunk_size=dict(type='int', default=65536),
+            head=dict(type='int', default=10),
+            tail=dict(type='int', default=10),
+            window_size=dict(type='int', default=65536),
+            checksum_algorithm=dict(type='str', default='sha256', choices=['md5', 'sha1', 'sha256', 'sha512']),
+            encoding=dict(type='str', default='text', choices=['text', 'base64']),
+        ),
+        supports_check_mode=True,
+    )
+    params = module.params
+    path = params['path']
+    if params['offset'] < 0:
+        module.fail_json(msg='offset must not be negative')
+    for option in ('chunk_size', 'window_size'):
+        if params[option] <= 0:
+            module.fail_json(msg='%s must be positive' % option)
+
+    try:
+        f = open(path, 'rb')
+    except (IOError, OSError) as e:
+        module.fail_json(msg='unable to open %s: %s' % (path, e))
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        result = {'changed': False, 'path': path, 'size': size}
+        if params['mode'] == 'chunk':
+            data, position = read_chunk(f, size, params['offset'], params['chunk_size'])
+            result.update(position)
+            result['content'] = encode(data, params['encoding'])
+        elif params['mode'] == 'digest':
+            result['checksum'] = file_checksum(f, params['checksum_algorithm'])
+            result['checksum_algorithm'] = params['checksum_algorithm']
+        else:
+            head, head_end = read_head(f, params['head'], params['window_size'])
+            tail, tail_start = read_tail(f, size, params['tail'], params['window_size'], head_end)
+            result['head'] = encode(head, params['encoding'])
+            result['tail'] = encode(tail, params['encoding'])
+            result['truncated'] = tail_start > head_end
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import random
 
 from ansible.module_utils.basic import * # noqa
 
@@ -11,8 +12,36 @@ module: scan_facts
 short_description: Return sample facts into facts namespace.
 description:
     - Return sample facts into facts namespace.
+    - When C(payload_size) is set, also return a generated C(scan_payload) fact of roughly that many
+      bytes, to stress fact serialization, result transfer and fact caching.
 version_added: "2.3"
 options:
+    payload_size:
+        description:
+            - Approximate size of the generated C(scan_payload) fact, e.g. C(512K) or C(20M).
+            - C(0) returns only the fixed sample facts.
+        type: bytes
+        default: 0
+    payload_depth:
+        description: Nesting depth of each generated subtree.
+        type: int
+        default: 3
+    payload_width:
+        description: Number of items in each generated list.
+        type: int
+        default: 10
+    payload_string_length:
+        description: Length in characters of each generated string.
+        type: int
+        default: 64
+    payload_unicode_ratio:
+        description: Share of generated strings built from copies of C(unicode_string) rather than ASCII.
+        type: float
+        default: 0.0
+    payload_seed:
+        description: Seed for choosing which strings are unicode, so payloads are reproducible.
+        type: int
+        default: 0
 requirements: []
 author: Chris Meyers, Christopher Wang
 '''
@@ -42,11 +71,64 @@ EXAMPLES = '''
     },
     "changed": false
 }
+
+# About 10MB of facts nested 4 deep, a quarter of the strings unicode
+- test_scan_facts:
+    payload_size: 10M
+    payload_depth: 4
+    payload_width: 8
+    payload_unicode_ratio: 0.25
 '''
 
+
+class PayloadBuilder(object):
+    """Builds nested lists of dicts until a byte budget is spent."""
+
+    def __init__(self, size, depth, width, string_length, unicode_ratio, unicode_string, seed):
+        self.remaining = size
+        self.depth = depth
+        self.width = width
+        self.rng = random.Random(seed)
+        self.unicode_ratio = unicode_ratio
+        repeats = string_length // len(unicode_string) + 1
+        self.unicode_leaf = (unicode_string * repeats)[:string_length]
+        self.ascii_leaf = ('abcdefghijklmnopqrstuvwxyz' * (string_length // 26 + 1))[:string_length]
+        self.unicode_leaf_bytes = len(self.unicode_leaf.encode('utf-8'))
+
+    def leaf(self):
+        if self.rng.random() < self.unicode_ratio:
+            self.remaining -= self.unicode_leaf_bytes + 4
+            return self.unicode_leaf
+        self.remaining -= len(self.ascii_leaf) + 4
+        return self.ascii_leaf
+
+    def node(self, depth):
+        if depth <= 0:
+            return self.leaf()
+        items = []
+        for i in range(self.width):
+            if self.remaining <= 0:
+                break
+            items.append(self.node(depth - 1))
+        self.remaining -= 24
+        return {"depth": depth, "items": items}
+
+    def build(self):
+        payload = []
+        while self.remaining > 0:
+            payload.append(self.node(self.depth))
+        return payload
+
 def main():
     module = AnsibleModule(
-        argument_spec = dict())
+        argument_spec = dict(
+            payload_size=dict(type='bytes', default=0),
+            payload_depth=dict(type='int', default=3),
+            payload_width=dict(type='int', default=10),
+            payload_string_length=dict(type='int', default=64),
+            payload_unicode_ratio=dict(type='float', default=0.0),
+            payload_seed=dict(type='int', default=0)))
+    params = module.params
 
     string="abc"
     unicode_string="鵟犭酜귃ꔀꈛ竳䙭韽ࠔ"
@@ -67,6 +149,17 @@ def main():
 
     results = dict(ansible_facts=dict(string=string, unicode_string=unicode_string, int=int, float=float, bool=bool,
                                       null=null, list=list, obj=obj, empty_list=empty_list, empty_obj=empty_obj))
+
+    if params['payload_size'] > 0:
+        if params['payload_depth'] < 0 or params['payload_width'] < 1 or params['payload_string_length'] < 1:
+            module.fail_json(msg="payload_depth must be >= 0, payload_width and payload_string_length >= 1")
+        if not 0.0 <= params['payload_unicode_ratio'] <= 1.0:
+            module.fail_json(msg="payload_unicode_ratio must be between 0.0 and 1.0")
+        builder = PayloadBuilder(params['payload_size'], params['payload_depth'], params['payload_width'],
+                                 params['payload_string_length'], params['payload_unicode_ratio'],
+                                 unicode_string, params['payload_seed'])
+        results['ansible_facts']['scan_payload'] = builder.build()
+        results['payload_bytes'] = params['payload_size'] - builder.remaining
     module.exit_json(**results)
 
 main()
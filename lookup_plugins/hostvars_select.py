@@ -0,0 +1,186 @@
+# python 3 headers, required if submitting to Ansible
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+    lookup: hostvars_select
+    author: Ansible Tower QE
+    version_added: "2.9"
+    short_description: read named variables of the hosts matching a pattern
+    description:
+        - Returns a dict of host name to a dict of only the named keys, for every host matching the host patterns.
+        - Unlike C(hostvars) in a template or C(debug var=hostvars), no host's full variable set is templated or
+          copied into the result; hosts are visited one at a time and only the requested values are templated.
+        - With C(source=inventory) (default) the merged variable set is never built. Each key is looked up, highest
+          precedence first, in the extra vars, the host's C(set_fact)/registered vars, its C(include_vars) vars, its
+          facts, its inventory host vars and its inventory group vars, through a chained view of those dicts.
+        - That skips role defaults and role vars, play C(vars)/C(vars_files)/C(vars_prompt), block and task vars,
+          and everything vars plugins provide, including C(group_vars)/C(host_vars) files next to the inventory or
+          playbook. Keys defined there are missing or resolve to a lower precedence value; use C(source=vars) for them.
+        - With C(source=vars) each host's variables are resolved with the usual precedence, like
+          C(hostvars[host][key]). This builds every matched host's full variable set, so it costs about as much
+          as C(extract) and only saves templating the keys that were not asked for.
+        - Patterns ignore C(--limit), like C(hostvars).
+    options:
+      _terms:
+        description: Host patterns, as in C(hosts:).
+        required: True
+      keys:
+        description: Variable names to return for each host.
+        type: list
+        required: True
+      default:
+        description: Value for keys a host does not have. When not set, missing keys are left out.
+      source:
+        description: Where values are read from, see the description.
+        type: str
+        default: inventory
+        choices: ['inventory', 'vars']
+      template:
+        description: Template the values in the host's context; when false raw values are returned.
+        type: bool
+        default: True
+"""
+
+EXAMPLES = """
+- debug:
+    msg: "{{ lookup('hostvars_select', 'webservers', keys=['ansible_host', 'http_port']) }}"
+
+# http_port is set in group_vars/webservers.yml, which only source=vars sees
+- debug:
+    msg: "{{ lookup('hostvars_select', 'webservers', keys=['http_port'], source='vars') }}"
+
+# instead of looping over groups['all'] | map('extract', hostvars, 'x')
+- set_fact:
+    all_x: "{{ lookup('hostvars_select', 'all', keys=['x'], default=None) | dict2items
+               | map(attribute='value.x') | list }}"
+"""
+
+RETURN = """
+  _raw:
+    description: a single dict of host name to a dict of the requested keys
+    type: list
+"""
+from ansible.errors import AnsibleError
+from ansible.inventory.helpers import get_group_vars
+from ansible.module_utils.common._collections_compat import Mapping
+from ansible.plugins.lookup import LookupBase
+from ansible.template import Templar
+from ansible.vars.hostvars import STATIC_VARS
+
+_MISSING = object()
+
+
+class _PrefixedFacts(Mapping):
+    ''' gathered facts under their ansible_ prefixed names, without copying them '''
+
+    def __init__(self, facts):
+        self._facts = facts
+
+    def __getitem__(self, key):
+        if key.startswith('ansible_') and key[8:] in self._facts:
+            return self._facts[key[8:]]
+        raise KeyError(key)
+
+    def __iter__(self):
+        for key in self._facts:
+            yield 'ansible_' + key
+
+    def __len__(self):
+        return len(self._facts)
+
+
+class _ChainedVars(Mapping):
+    ''' read-only view of several dicts, the first one holding a key wins '''
+
+    def __init__(self, maps):
+        self._maps = maps
+
+    def __getitem__(self, key):
+        for mapping in self._maps:
+            if key in mapping:
+                return mapping[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return any(key in mapping for mapping in self._maps)
+
+    def __iter__(self):
+        seen = set()
+        for mapping in self._maps:
+            for key in mapping:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _inventory_sources(variable_manager, host):
+    ''' the per-host dicts a key is looked for in with source=inventory, highest precedence first '''
+    sources = [variable_manager.extra_vars]
+    for cache in ('_nonpersistent_fact_cache', '_vars_cache'):
+        data = getattr(variable_manager, cache, {}).get(host.name)
+        if data:
+            sources.append(data)
+    facts = variable_manager._fact_cache.get(host.name)
+    if facts:
+        sources.append(facts)
+        sources.append(_PrefixedFacts(facts))
+    sources.append(host.vars)
+    sources.append(get_group_vars(host.get_groups()))
+    # inventory_hostname and friends, so values can be templated in the host's context
+    sources.append(host.get_magic_vars())
+    return sources
+
+
+class LookupModule(LookupBase):
+
+    def _templar_for(self, variables):
+        templar = Templar(loader=self._loader, variables={})
+        templar.available_variables = variables
+        return templar
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        keys = self.get_option('keys')
+        default = kwargs.get('default', _MISSING)
+        from_inventory = self.get_option('source') == 'inventory'
+        template = self.get_option('template')
+
+        hostvars = (variables or {}).get('hostvars')
+        if hostvars is None or not hasattr(hostvars, '_inventory'):
+            raise AnsibleError('hostvars_select: hostvars is not available to this lookup')
+        inventory = hostvars._inventory
+        variable_manager = hostvars._variable_manager
+
+        hosts = []
+        seen = set()
+        for pattern in terms:
+            for host in inventory.get_hosts(pattern, ignore_limits=True, ignore_restrictions=True):
+                if host.name not in seen:
+                    seen.add(host.name)
+                    hosts.append(host)
+
+        templar = None
+        result = {}
+        for host in hosts:
+            if from_inventory:
+                host_vars = _ChainedVars(_inventory_sources(variable_manager, host))
+            else:
+                host_vars = variable_manager.get_vars(host=host, include_hostvars=False)
+            found = dict((key, host_vars[key]) for key in keys if key in host_vars)
+
+            if template and found:
+                if templar is None:
+                    templar = self._templar_for(host_vars)
+                else:
+                    templar.available_variables = host_vars
+                found = dict((key, templar.template(value, fail_on_undefined=False, static_vars=STATIC_VARS))
+                             for key, value in found.items())
+            if default is not _MISSING:
+                for key in keys:
+                    found.setdefault(key, default)
+            result[host.name] = found
+        return [result]
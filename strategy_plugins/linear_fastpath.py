@@ -0,0 +1,98 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    strategy: linear_fastpath
+    short_description: Linear strategy that runs controller-only tasks in-process
+    description:
+        - Behaves exactly like the C(linear) strategy, except that tasks whose action runs entirely on the
+          controller (C(debug), C(set_fact), C(assert), C(fail)) and that are not delegated or async are
+          executed in the controller process instead of in a forked worker.
+        - Linear queues a task for every host before collecting results, so these tasks run back to back for
+          all hosts in one batch; their results go through the normal result queue and processing, so
+          callbacks, registered vars and facts behave as usual.
+        - Every other task falls back to the linear strategy's worker path unchanged.
+        - Use with C(strategy: linear_fastpath) or C(ANSIBLE_STRATEGY=linear_fastpath).
+    version_added: "2.9"
+    author: Ansible Tower QE
+'''
+
+import inspect
+import traceback
+
+from ansible.executor.task_executor import TaskExecutor
+from ansible.executor.task_result import TaskResult
+from ansible.module_utils._text import to_text
+from ansible.plugins import loader as plugin_loader
+from ansible.plugins.strategy.linear import StrategyModule as LinearStrategyModule
+from ansible.utils.display import Display
+
+display = Display()
+
+FAST_PATH_ACTIONS = frozenset(['debug', 'set_fact', 'assert', 'fail'])
+FAST_PATH_ACTIONS = FAST_PATH_ACTIONS | frozenset('ansible.builtin.' + a for a in FAST_PATH_ACTIONS) | \
+    frozenset('ansible.legacy.' + a for a in FAST_PATH_ACTIONS)
+
+
+def _parameter_names(func):
+    try:
+        return list(inspect.signature(func).parameters)
+    except AttributeError:  # python 2
+        return inspect.getargspec(func).args[1:]
+
+
+class StrategyModule(LinearStrategyModule):
+
+    def __init__(self, tqm):
+        super(StrategyModule, self).__init__(tqm)
+        self._executor_params = _parameter_names(TaskExecutor.__init__)
+        self._fast_path_count = 0
+        self._worker_count = 0
+
+    def _is_fast_path(self, task):
+        return task.action in FAST_PATH_ACTIONS and not task.delegate_to and not task.async_val
+
+    def _queue_task(self, host, task, task_vars, play_context):
+        if not self._is_fast_path(task):
+            self._worker_count += 1
+            return super(StrategyModule, self)._queue_task(host, task, task_vars, play_context)
+
+        self._fast_path_count += 1
+        self._queued_task_cache[(host.name, task._uuid)] = {
+            'host': host,
+            'task': task,
+            'task_vars': task_vars,
+            'play_context': play_context,
+        }
+        self._tqm.send_callback('v2_runner_on_start', host, task)
+
+        # TaskExecutor templates and post-validates the task it is given, which
+        # a forked worker would do on its own copy; do the same here
+        available = {
+            'host': host,
+            'task': task.copy(),
+            'job_vars': task_vars,
+            'play_context': play_context,
+            'new_stdin': None,
+            'loader': self._loader,
+            'shared_loader_obj': plugin_loader,
+            'final_q': self._final_q,
+            'variable_manager': self._variable_manager,
+        }
+        try:
+            executor = TaskExecutor(**dict((k, available[k]) for k in self._executor_params if k in available))
+            executor_result = executor.run()
+        except Exception:
+            executor_result = dict(failed=True, exception=to_text(traceback.format_exc()), stdout='')
+
+        if hasattr(self._final_q, 'send_task_result'):
+            self._final_q.send_task_result(host.name, task._uuid, executor_result, task_fields=task.dump_attrs())
+        else:
+            self._final_q.put(TaskResult(host.name, task._uuid, executor_result, task_fields=task.dump_attrs()))
+        self._pending_results += 1
+
+    def run(self, iterator, play_context):
+        result = super(StrategyModule, self).run(iterator, play_context)
+        display.vv('linear_fastpath: %d task executions in-process, %d in workers'
+                   % (self._fast_path_count, self._worker_count))
+        return result
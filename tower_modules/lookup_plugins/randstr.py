@@ -9,12 +9,42 @@ DOCUMENTATION = """
     short_description: generate random string
     description:
         - This lookup returns a random string.
+        - With C(count), a single call returns that many strings, all cut from one buffer of
+          random bytes instead of being built a character at a time.
+    options:
+      count:
+        description: Number of strings to return.
+        type: int
+        default: 1
+      length:
+        description: Length of each string.
+        type: int
+        default: 12
+      chars:
+        description: Characters to draw from, at most 256 of them.
+        type: str
+        default: abcdefghijklmnopqrstuvwxyz
+"""
+
+EXAMPLES = """
+- debug:
+    msg: "{{ lookup('randstr') }}"
+
+# one lookup call for a thousand 20 character tokens
+- set_fact:
+    tokens: "{{ query('randstr', count=1000, length=20, chars='0123456789abcdef') }}"
+"""
+
+RETURN = """
+  _raw:
+    description: the generated strings
+    type: list
 """
 from ansible.errors import AnsibleError, AnsibleParserError
 from ansible.plugins.lookup import LookupBase
 
+import os
 import string
-import random
 
 try:
     from __main__ import display
@@ -23,7 +53,38 @@ except ImportError:
     display = Display()
 
 
+def random_strings(count, length, chars=string.ascii_lowercase):
+    """Return ``count`` uniformly random strings of ``length`` characters from ``chars``.
+
+    Random bytes are read from os.urandom in bulk. Bytes at or above the
+    largest multiple of len(chars) are dropped so every character is equally
+    likely, and the rest are mapped to characters with a single translate.
+    """
+    size = len(chars)
+    if not 1 <= size <= 256:
+        raise AnsibleError('randstr: chars must contain between 1 and 256 characters, got %d' % size)
+    if count < 0 or length < 0:
+        raise AnsibleError('randstr: count and length must not be negative')
+    needed = count * length
+    limit = 256 - (256 % size)
+    rejected = bytes(bytearray(range(limit, 256)))
+    accepted = bytearray()
+    while len(accepted) < needed:
+        # over-read by the expected rejection rate plus a little slack
+        missing = needed - len(accepted)
+        accepted.extend(os.urandom(missing * 256 // limit + 16).translate(None, rejected))
+    del accepted[needed:]
+    try:
+        table = bytes(bytearray(ord(chars[b % size]) for b in range(256)))
+        text = accepted.translate(table).decode('ascii')
+    except ValueError:
+        # non-ASCII alphabets cannot go through a byte translation table
+        text = u''.join([chars[b % size] for b in accepted])
+    return [text[i:i + length] for i in range(0, needed, length)] if length else [u''] * count
+
+
 class LookupModule(LookupBase):
 
     def run(self, terms, variables=None, **kwargs):
-        return [''.join(random.choice(string.ascii_lowercase) for i in range(12))]
+        self.set_options(var_options=variables, direct=kwargs)
+        return random_strings(self.get_option('count'), self.get_option('length'), self.get_option('chars'))
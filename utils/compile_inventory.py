@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""Pre-merge layered inventory sources into one compiled YAML inventory.
+
+Loads every source (INI files, inventory scripts, directories, anything
+``-i`` accepts) once, in order, exactly as ``ansible -i A -i B ...`` would,
+and writes the merged result as a single ``yaml`` inventory plugin file.
+Each host and group body is written once: group and host vars are the
+already merged values, and every later mention is a bare reference.
+
+Before the output replaces OUTPUT the compiled file is parsed back and
+checked against the layered inventory: every group's hosts in order, its
+children, vars and priority, and every host's groups and resolved
+inventory vars must be identical, otherwise nothing is written.
+
+group_vars/ and host_vars/ directories next to the sources are read by vars
+plugins, not by the inventory, so they are not compiled; keep them next to
+OUTPUT (or see utils/compile_vars_bundle.py).
+
+Example:
+
+    python utils/compile_inventory.py -o compiled.yml inventories/inventory.ini \\
+        inventories/more_inventories/dyn_inventory.py \\
+        inventories/more_inventories/even_more_inventories/inventory.ini
+    ansible-inventory -i compiled.yml --graph
+"""
+from argparse import ArgumentParser
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+from ansible.inventory.helpers import get_group_vars
+from ansible.inventory.manager import InventoryManager
+from ansible.parsing.dataloader import DataLoader
+from ansible.parsing.yaml.dumper import AnsibleDumper
+from ansible.utils.vars import combine_vars
+
+# set by the inventory for every host; they point at the source, so they differ by design
+SOURCE_VARS = ('inventory_file', 'inventory_dir')
+
+
+def host_vars(host):
+    return dict((k, v) for k, v in host.vars.items() if k not in SOURCE_VARS)
+
+
+def group_vars(group):
+    data = dict(group.get_vars())
+    if group.priority != 1:
+        data['ansible_group_priority'] = group.priority
+    return data
+
+
+def compile_groups(inventory):
+    ''' the inventory as yaml plugin data, with each group and host body written once '''
+    seen_groups = set(['all'])
+    seen_hosts = set()
+
+    def render(group):
+        body = {}
+        data = group_vars(group)
+        if data:
+            body['vars'] = data
+        hosts = {}
+        for host in group.hosts:
+            if host.name not in seen_hosts:
+                seen_hosts.add(host.name)
+                hosts[host.name] = host_vars(host) or None
+            else:
+                hosts[host.name] = None
+        if hosts:
+            body['hosts'] = hosts
+        children = {}
+        for child in group.child_groups:
+            if child.name not in seen_groups:
+                seen_groups.add(child.name)
+                children[child.name] = render(child) or None
+            else:
+                children[child.name] = None
+        if children:
+            body['children'] = children
+        return body
+
+    return {'all': render(inventory.groups['all'])}
+
+
+def resolve(inventory):
+    ''' what plays see of an inventory, for comparing two of them '''
+    groups = {}
+    for name, group in inventory.groups.items():
+        groups[name] = {'hosts': [h.name for h in group.get_hosts()],
+                        'children': sorted(c.name for c in group.child_groups),
+                        'vars': group.get_vars(),
+                        'priority': group.priority}
+    hosts = {}
+    for name, host in inventory.hosts.items():
+        hosts[name] = {'groups': sorted(g.name for g in host.get_groups()),
+                       'vars': combine_vars(get_group_vars(host.get_groups()), host_vars(host))}
+    return {'groups': groups, 'hosts': hosts}
+
+
+def differences(layered, compiled, limit=10):
+    found = []
+    for kind in ('groups', 'hosts'):
+        for name in sorted(set(layered[kind]) | set(compiled[kind])):
+            if layered[kind].get(name) != compiled[kind].get(name):
+                found.append('{0} {1}: layered {2!r} != compiled {3!r}'.format(
+                    kind[:-1], name, layered[kind].get(name), compiled[kind].get(name)))
+                if len(found) == limit:
+                    return found
+    return found
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('sources', nargs='+', help='Inventory sources, lowest precedence first')
+    parser.add_argument('-o', '--output', required=True, help='Compiled inventory path (.yml, .yaml or .json)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if os.path.splitext(args.output)[1] not in ('.yml', '.yaml', '.json'):
+        sys.exit('--output must end in .yml, .yaml or .json for the yaml inventory plugin to read it')
+    loader = DataLoader()
+
+    start = time.time()
+    layered = InventoryManager(loader=loader, sources=args.sources)
+    loaded = time.time()
+    data = compile_groups(layered)
+
+    directory = os.path.dirname(os.path.abspath(args.output))
+    fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(args.output)[1], dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            yaml.dump(data, f, Dumper=AnsibleDumper, default_flow_style=False, sort_keys=False)
+        compiled = InventoryManager(loader=loader, sources=[tmp_path])
+        found = differences(resolve(layered), resolve(compiled))
+        if found:
+            sys.exit('compiled inventory is not equivalent to the sources:\n  ' + '\n  '.join(found))
+        os.rename(tmp_path, args.output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    print('compiled {0} sources ({1} hosts, {2} groups) into {3}: loaded in {4:.3f}s, verified in {5:.3f}s'.format(
+        len(args.sources), len(layered.hosts), len(layered.groups), args.output, loaded - start,
+        time.time() - loaded))
+
+
+if __name__ == '__main__':
+    main()
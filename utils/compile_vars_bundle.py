@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Compile group_vars/ and host_vars/ into one vars bundle for the vars_bundle plugin.
+
+Finds the vars files of every group and host under DIR/group_vars and
+DIR/host_vars with the loader call host_group_vars uses, so the same files
+are picked and merged in the same order, and writes DIR/vars.bundle.
+Inline ``!vault`` values stay encrypted and ``!unsafe`` values stay unsafe
+in the bundle. Whole-file vaulted sources are refused rather than written
+out decrypted; convert them to inline values with ``ansible-vault
+encrypt_string`` first.
+
+Example:
+
+    python utils/compile_vars_bundle.py inventories
+    ANSIBLE_VARS_PLUGINS=vars_plugins ANSIBLE_VARS_ENABLED=vars_bundle \\
+        ansible-inventory -i inventories/inventory --list
+"""
+from argparse import ArgumentParser
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'vars_plugins'))
+
+from ansible import constants as C  # noqa: E402
+from ansible.module_utils._text import to_text  # noqa: E402
+from ansible.parsing.dataloader import DataLoader  # noqa: E402
+from ansible.parsing.vault import is_encrypted_file  # noqa: E402
+from ansible.utils.vars import combine_vars  # noqa: E402
+from vars_bundle import BUNDLE_NAME, write_bundle  # noqa: E402
+
+KINDS = (('group', 'group_vars'), ('host', 'host_vars'))
+
+
+def entity_names(root):
+    ''' names of the groups or hosts that have vars under root '''
+    names = set()
+    for entry in os.listdir(root):
+        if entry.startswith('.'):
+            continue
+        # "web.example.com" is a host name, "web.example.com.yml" its vars file
+        name, ext = os.path.splitext(entry)
+        if os.path.isdir(os.path.join(root, entry)) or ext not in C.YAML_FILENAME_EXTENSIONS:
+            name = entry
+        names.add(name)
+    return sorted(names)
+
+
+def load_entities(basedir, loader):
+    entities = {}
+    sources = 0
+    for kind, subdir in KINDS:
+        root = os.path.realpath(os.path.join(basedir, subdir))
+        if not os.path.isdir(root):
+            continue
+        for name in entity_names(root):
+            data = {}
+            # same lookup and merge as host_group_vars: the first of <name>, <name>.yml,
+            # .yaml, .json (or a <name>/ directory) wins, combined with combine_vars
+            for source in loader.find_vars_files(root, name):
+                with open(source, 'rb') as f:
+                    if is_encrypted_file(f):
+                        sys.exit('{0} is vaulted as a whole file and would be stored decrypted; use inline '
+                                 '!vault values (ansible-vault encrypt_string) instead'.format(to_text(source)))
+                loaded = loader.load_from_file(source, cache=False, unsafe=True)
+                if not loaded:
+                    continue
+                if not isinstance(loaded, dict):
+                    sys.exit('{0} must contain a dictionary of variables'.format(to_text(source)))
+                data = combine_vars(data, loaded)
+                sources += 1
+            entities[(kind, name)] = data
+    return entities, sources
+
+
+def parse_args():
+    parser = ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('basedir', help='Directory holding group_vars/ and host_vars/')
+    parser.add_argument('--output', help='Bundle path (default: BASEDIR/{0})'.format(BUNDLE_NAME))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    loader = DataLoader()
+    start = time.time()
+    entities, sources = load_entities(args.basedir, loader)
+    output = args.output or os.path.join(args.basedir, BUNDLE_NAME)
+    write_bundle(output, entities)
+    print('compiled {0} files for {1} entities into {2} ({3} bytes) in {4:.3f}s'.format(
+        sources, len(entities), output, os.path.getsize(output), time.time() - start))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    vars: lazy_vault_vars
+    version_added: "2.9"
+    short_description: Loads vars with inline vaulted values that are decrypted on first use, once per run
+    requirements:
+        - enabled in configuration
+    description:
+        - Loads YAML files from C(lazy_vault_vars/group_vars/<group>.yml) and C(lazy_vault_vars/host_vars/<host>.yml)
+          next to the inventory or playbook, the same layout as C(group_vars)/C(host_vars).
+        - Inline C(!vault) values, under any vault id, stay encrypted until a template reads them. The first read
+          decrypts the value and remembers the plaintext, so every later read in the same process is free. Stock
+          inline vault values are decrypted again on every read.
+        - Templates evaluated on the controller populate the cache before workers fork, so workers inherit it;
+          values first read inside a worker are decrypted once per worker.
+        - Whole-file vaulted files are still decrypted when they are loaded, because their structure is encrypted too.
+    options:
+      stage:
+        ini:
+          - key: stage
+            section: vars_lazy_vault_vars
+        env:
+          - name: ANSIBLE_VARS_PLUGIN_STAGE
+'''
+
+import os
+
+from ansible.errors import AnsibleParserError
+from ansible.inventory.group import Group
+from ansible.inventory.host import Host
+from ansible.module_utils._text import to_bytes, to_native, to_text
+from ansible.parsing.yaml.objects import AnsibleVaultEncryptedUnicode
+from ansible.plugins.vars import BaseVarsPlugin
+from ansible.utils.display import Display
+
+display = Display()
+
+VARS_DIR = 'lazy_vault_vars'
+EXTENSIONS = ('.yml', '.yaml', '.json')
+
+# plaintext by ciphertext, shared by every value loaded in this process
+_DECRYPTED = {}
+_LOADED = {}
+
+
+class CachedVaultEncryptedUnicode(AnsibleVaultEncryptedUnicode):
+    ''' an inline vault value that decrypts at most once per process '''
+
+    @classmethod
+    def from_encrypted(cls, value):
+        cached = cls(value._ciphertext)
+        cached.vault = value.vault
+        cached.ansible_pos = value.ansible_pos
+        return cached
+
+    @property
+    def data(self):
+        try:
+            return _DECRYPTED[self._ciphertext]
+        except KeyError:
+            pass
+        if not self.vault:
+            return to_text(self._ciphertext)
+        plaintext = to_text(self.vault.decrypt(self._ciphertext, obj=self))
+        _DECRYPTED[self._ciphertext] = plaintext
+        return plaintext
+
+    @data.setter
+    def data(self, value):
+        self._ciphertext = to_bytes(value)
+
+
+def wrap_vaulted(data):
+    ''' replace every inline vault value in loaded data with a caching one '''
+    if isinstance(data, AnsibleVaultEncryptedUnicode):
+        return CachedVaultEncryptedUnicode.from_encrypted(data)
+    if isinstance(data, dict):
+        for key, value in data.items():
+            data[key] = wrap_vaulted(value)
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            data[i] = wrap_vaulted(value)
+    return data
+
+
+class VarsModule(BaseVarsPlugin):
+
+    REQUIRES_WHITELIST = True
+    REQUIRES_ENABLED = True
+
+    def _load_file(self, loader, path, cache=True):
+        if not cache or path not in _LOADED:
+            data = loader.load_from_file(path, cache=False, unsafe=True)
+            if data is None:
+                data = {}
+            if not isinstance(data, dict):
+                raise AnsibleParserError('%s must contain a dictionary of variables' % to_native(path))
+            _LOADED[path] = wrap_vaulted(data)
+        return _LOADED[path]
+
+    def get_vars(self, loader, path, entities, cache=True):
+        if not isinstance(entities, list):
+            entities = [entities]
+
+        super(VarsModule, self).get_vars(loader, path, entities)
+
+        data = {}
+        for entity in entities:
+            if isinstance(entity, Host):
+                subdir = 'host_vars'
+            elif isinstance(entity, Group):
+                subdir = 'group_vars'
+            else:
+                raise AnsibleParserError('Supplied entity must be Host or Group, got %s instead' % (type(entity)))
+            # avoid 'chroot' type inventory hostnames /path/to/chroot
+            if entity.name.startswith(os.path.sep):
+                continue
+            base = os.path.join(self._basedir, VARS_DIR, subdir, entity.name)
+            for ext in EXTENSIONS:
+                candidate = base + ext
+                if os.path.isfile(candidate):
+                    data.update(self._load_file(loader, candidate, cache))
+                    break
+        return data
@@ -0,0 +1,136 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    vars: vars_bundle
+    version_added: "2.9"
+    short_description: Serves group_vars and host_vars from one precompiled, memory mapped bundle file
+    requirements:
+        - enabled in configuration
+    description:
+        - Looks for C(vars.bundle) next to the inventory or playbook, as produced by
+          C(utils/compile_vars_bundle.py) from that directory's C(group_vars) and C(host_vars) trees.
+        - The bundle is memory mapped and only its small index is parsed up front; each host's or group's vars
+          are decoded the first time they are requested, so startup does not stat or parse one file per entity.
+        - Inline vaulted and unsafe values survive compilation and come back as the same types; the compiler refuses
+          whole-file vaulted sources instead of storing them decrypted.
+        - Meant to replace C(host_group_vars) (for example C(ANSIBLE_VARS_ENABLED=vars_bundle)); the bundle is not
+          checked against the source tree, so recompile it whenever the vars change.
+    options:
+      stage:
+        ini:
+          - key: stage
+            section: vars_vars_bundle
+        env:
+          - name: ANSIBLE_VARS_PLUGIN_STAGE
+'''
+
+import json
+import mmap
+import os
+import struct
+
+from ansible.errors import AnsibleParserError
+from ansible.inventory.group import Group
+from ansible.inventory.host import Host
+from ansible.module_utils._text import to_native, to_text
+from ansible.parsing.ajson import AnsibleJSONDecoder, AnsibleJSONEncoder
+from ansible.plugins.vars import BaseVarsPlugin
+
+BUNDLE_NAME = 'vars.bundle'
+# magic, index length; followed by the JSON index and then the entity blobs.
+# The index maps "group:<name>"/"host:<name>" to [offset, length] in the blob.
+BUNDLE_MAGIC = b'VARSBND1'
+_HEADER = struct.Struct('<8sQ')
+
+_BUNDLES = {}
+
+
+def write_bundle(path, entities):
+    ''' write {("group"|"host", name): vars} to a bundle file, replacing it atomically '''
+    # str subclasses never reach default(), so unsafe strings are only tagged when preprocessed
+    encoder = AnsibleJSONEncoder(preprocess_unsafe=True, sort_keys=True)
+    index = {}
+    blobs = []
+    offset = 0
+    for (kind, name), data in sorted(entities.items()):
+        blob = encoder.encode(data).encode('utf-8')
+        index['{0}:{1}'.format(kind, name)] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+    encoded_index = json.dumps(index, sort_keys=True).encode('utf-8')
+    tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(BUNDLE_MAGIC, len(encoded_index)))
+        f.write(encoded_index)
+        for blob in blobs:
+            f.write(blob)
+    os.rename(tmp_path, path)
+
+
+class Bundle(object):
+    ''' read side of a bundle: mmap once, decode entities on demand '''
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != BUNDLE_MAGIC:
+            raise AnsibleParserError('%s is not a vars bundle' % to_native(path))
+        index_end = _HEADER.size + index_length
+        self._index = json.loads(to_text(self._mmap[_HEADER.size:index_end]))
+        self._data_start = index_end
+        self._decoded = {}
+
+    def get(self, kind, name):
+        key = '{0}:{1}'.format(kind, name)
+        if key not in self._decoded:
+            location = self._index.get(key)
+            if location is None:
+                self._decoded[key] = None
+            else:
+                start = self._data_start + location[0]
+                self._decoded[key] = json.loads(to_text(self._mmap[start:start + location[1]]),
+                                                cls=AnsibleJSONDecoder)
+        return self._decoded[key]
+
+
+class VarsModule(BaseVarsPlugin):
+
+    REQUIRES_WHITELIST = True
+    REQUIRES_ENABLED = True
+
+    def _bundle(self, loader):
+        path = os.path.join(self._basedir, BUNDLE_NAME)
+        if path not in _BUNDLES:
+            if os.path.isfile(path):
+                vault = getattr(loader, '_vault', None)
+                if vault is not None and vault.secrets:
+                    AnsibleJSONDecoder.set_secrets(vault.secrets)
+                _BUNDLES[path] = Bundle(path)
+            else:
+                _BUNDLES[path] = None
+        return _BUNDLES[path]
+
+    def get_vars(self, loader, path, entities, cache=True):
+        if not isinstance(entities, list):
+            entities = [entities]
+
+        super(VarsModule, self).get_vars(loader, path, entities)
+
+        bundle = self._bundle(loader)
+        data = {}
+        if bundle is None:
+            return data
+        for entity in entities:
+            if isinstance(entity, Host):
+                kind = 'host'
+            elif isinstance(entity, Group):
+                kind = 'group'
+            else:
+                raise AnsibleParserError('Supplied entity must be Host or Group, got %s instead' % (type(entity)))
+            found = bundle.get(kind, entity.name)
+            if found:
+                data.update(found)
+        return data